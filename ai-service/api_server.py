@@ -0,0 +1,296 @@
+"""
+AI Worker 服务
+
+启动时一次性加载并预热模型，之后常驻处理任务。
+任务先进入有界队列；模型未就绪或队列满时返回 503 + Retry-After 让调用方退避重试。
+
+环境变量:
+    AI_BACKEND: 模型后端 (diffusion / stub)
+    AI_PRELOAD_MODELS: 预加载的管道，逗号分隔 (inpaint,openpose,base)
+    AI_QUEUE_SIZE: 排队任务上限
+    AI_WORKER_CONCURRENCY: 同时执行的任务数
+    AI_MAX_FINISHED_JOBS: 保留的已完成任务数
+    AI_RESULT_DIR: 任务结果 PNG 的保存目录（结果不常驻内存）
+    AI_OUTPUT_CACHE_DIR / AI_OUTPUT_CACHE_MAX_MB: 扩散结果缓存目录和容量
+"""
+import asyncio
+import base64
+import io
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import uvicorn
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi.responses import FileResponse, JSONResponse
+from PIL import Image
+
+from quality_tiers import QUALITY_TIERS, DEFAULT_QUALITY
+from worker_backends import create_backend
+
+QUEUE_SIZE = int(os.getenv("AI_QUEUE_SIZE", "8"))
+WORKER_CONCURRENCY = int(os.getenv("AI_WORKER_CONCURRENCY", "1"))
+MAX_FINISHED_JOBS = int(os.getenv("AI_MAX_FINISHED_JOBS", "200"))
+RESULT_DIR = Path(os.getenv("AI_RESULT_DIR", "./cache/results"))
+OPERATION_TYPES = ("face_slim", "body_slim", "beauty_filter")
+FILTER_TYPES = ("natural", "glamour", "fresh", "artistic")
+PREVIEW_MAX_SIZE = 256
+
+# 任务记录（按提交顺序）
+jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+# 服务状态
+worker_state: Dict[str, Any] = {
+    "backend": None,
+    "ready": False,
+    "error": None,
+    "running": 0,
+    "completed": 0,
+    "failed": 0,
+    "rejected": 0,
+}
+
+job_queue: Optional[asyncio.Queue] = None
+
+
+def encode_preview(image: Image.Image) -> str:
+    """生成低分辨率预览图的 JPEG data URL"""
+    preview = image.convert("RGB")
+    preview.thumbnail((PREVIEW_MAX_SIZE, PREVIEW_MAX_SIZE), Image.Resampling.BILINEAR)
+    buffer = io.BytesIO()
+    preview.save(buffer, "JPEG", quality=70)
+    return "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def validate_operation(operation: Any):
+    """校验单个操作，参数不合法时返回 400（避免任务在 worker 中才失败）"""
+    if not isinstance(operation, dict) or operation.get("type") not in OPERATION_TYPES:
+        raise HTTPException(status_code=400, detail=f"不支持的操作: {operation}")
+
+    intensity = operation.get("intensity")
+    if isinstance(intensity, bool) or not isinstance(intensity, (int, float)) or not 0 <= intensity <= 1:
+        raise HTTPException(status_code=400, detail=f"intensity 必须是 0 到 1 之间的数字: {operation}")
+
+    if operation["type"] == "beauty_filter" and operation.get("filter_type", "natural") not in FILTER_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"滤镜类型必须是: {', '.join(FILTER_TYPES)}"
+        )
+
+    seed = operation.get("seed")
+    if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int)):
+        raise HTTPException(status_code=400, detail=f"seed 必须是整数: {operation}")
+
+
+def trim_finished_jobs():
+    """只保留最近 MAX_FINISHED_JOBS 个已结束的任务，并删除其结果文件"""
+    finished = [
+        job_id for job_id, job in jobs.items()
+        if job["status"] in ("completed", "failed")
+    ]
+    for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        job = jobs.pop(job_id)
+        if job.get("result_path"):
+            Path(job["result_path"]).unlink(missing_ok=True)
+
+
+def run_job(job_id: str, job: Dict[str, Any]) -> str:
+    """在线程中执行任务，结果保存为 PNG 文件并返回路径"""
+    operations = job["operations"]
+
+    def on_progress(index, step, total_steps, preview):
+        job["operation_index"] = index
+        job["step"] = step
+        job["total_steps"] = total_steps
+        job["progress"] = int(100 * (index + step / max(total_steps, 1)) / len(operations))
+        if preview is not None:
+            job["preview"] = encode_preview(preview)
+
+    image = Image.open(io.BytesIO(job.pop("image_bytes"))).convert("RGB")
+    result = worker_state["backend"].process(image, operations, job["quality"], on_progress)
+
+    result_path = RESULT_DIR / f"{job_id}.png"
+    result.save(result_path, "PNG")
+    return str(result_path)
+
+
+async def load_models():
+    """加载并预热模型（在线程中执行，不阻塞健康检查）"""
+    backend = worker_state["backend"]
+    try:
+        print(f"正在加载模型后端: {backend.name}")
+        start = time.time()
+        await asyncio.to_thread(backend.load)
+        await asyncio.to_thread(backend.warmup)
+        worker_state["ready"] = True
+        print(f"模型加载完成，用时 {time.time() - start:.1f}s")
+    except Exception as e:
+        worker_state["error"] = str(e)
+        print(f"模型加载失败: {e}")
+
+
+async def job_consumer():
+    """从队列中取任务执行（只有模型就绪后才会有任务入队）"""
+    while True:
+        job_id = await job_queue.get()
+        job = jobs.get(job_id)
+        if job is None:
+            job_queue.task_done()
+            continue
+
+        job["status"] = "processing"
+        job["started_at"] = time.time()
+        worker_state["running"] += 1
+        try:
+            job["result_path"] = await asyncio.to_thread(run_job, job_id, job)
+            job["status"] = "completed"
+            job["progress"] = 100
+            worker_state["completed"] += 1
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+            worker_state["failed"] += 1
+        finally:
+            job["finished_at"] = time.time()
+            job.pop("image_bytes", None)
+            worker_state["running"] -= 1
+            job_queue.task_done()
+            trim_finished_jobs()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global job_queue
+    job_queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    RESULT_DIR.mkdir(parents=True, exist_ok=True)
+    # 重启后任务记录已丢失，清理上次遗留的结果文件
+    for path in RESULT_DIR.glob("*.png"):
+        path.unlink(missing_ok=True)
+    worker_state["backend"] = create_backend()
+
+    background = [asyncio.create_task(load_models())]
+    background += [asyncio.create_task(job_consumer()) for _ in range(WORKER_CONCURRENCY)]
+    yield
+    for task in background:
+        task.cancel()
+
+
+app = FastAPI(title="臭小优P图 AI 服务", version="1.0.0", lifespan=lifespan)
+
+
+@app.post("/api/jobs", status_code=202)
+async def submit_job(
+    file: UploadFile = File(...),
+    operations: str = Form(...),
+    quality: str = Form(DEFAULT_QUALITY)
+):
+    """提交处理任务；模型未就绪或队列已满时返回 503"""
+    try:
+        operations_list = json.loads(operations)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="operations 必须是 JSON 数组")
+
+    if not isinstance(operations_list, list) or not operations_list:
+        raise HTTPException(status_code=400, detail="至少需要一个处理操作")
+    for operation in operations_list:
+        validate_operation(operation)
+    if quality not in QUALITY_TIERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"质量档位必须是: {', '.join(QUALITY_TIERS)}"
+        )
+    if worker_state["error"]:
+        # 加载失败无法自行恢复，不带 Retry-After，调用方不应重试
+        raise HTTPException(status_code=500, detail=f"模型加载失败: {worker_state['error']}")
+    if not worker_state["ready"]:
+        # 模型加载期间不接收任务，避免任务在加载失败后永远停留在 queued
+        raise HTTPException(
+            status_code=503,
+            detail="模型加载中，请稍后重试",
+            headers={"Retry-After": "5"}
+        )
+
+    image_bytes = await file.read()
+    if job_queue.full():
+        worker_state["rejected"] += 1
+        raise HTTPException(
+            status_code=503,
+            detail="任务队列已满，请稍后重试",
+            headers={"Retry-After": "2"}
+        )
+
+    job_id = uuid.uuid4().hex
+    jobs[job_id] = {
+        "status": "queued",
+        "operations": operations_list,
+        "quality": quality,
+        "progress": 0,
+        "image_bytes": image_bytes,
+        "submitted_at": time.time(),
+    }
+    job_queue.put_nowait(job_id)
+
+    return {"job_id": job_id, "status": "queued", "queue_depth": job_queue.qsize()}
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """获取任务状态、真实步数进度和中间预览"""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "progress": job["progress"],
+        "operation_index": job.get("operation_index"),
+        "step": job.get("step"),
+        "total_steps": job.get("total_steps"),
+        "preview": job.get("preview"),
+        "error": job.get("error"),
+    }
+
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """获取任务结果（PNG）"""
+    job = jobs.get(job_id)
+    if job is None or job["status"] != "completed":
+        raise HTTPException(status_code=404, detail="结果未找到")
+    return FileResponse(job["result_path"], media_type="image/png")
+
+
+@app.get("/ready")
+async def readiness():
+    """就绪检查：模型加载并预热完成前返回 503"""
+    if not worker_state["ready"]:
+        return JSONResponse(status_code=503, content={"ready": False, "error": worker_state["error"]})
+    return {"ready": True}
+
+
+@app.get("/health")
+async def health_check():
+    """健康检查，包含队列深度和就绪状态"""
+    return {
+        "status": "healthy" if not worker_state["error"] else "unhealthy",
+        "service": "臭小优P图 AI 服务",
+        "backend": worker_state["backend"].name if worker_state["backend"] else None,
+        "ready": worker_state["ready"],
+        "queue_depth": job_queue.qsize() if job_queue else 0,
+        "queue_capacity": QUEUE_SIZE,
+        "running": worker_state["running"],
+        "concurrency": WORKER_CONCURRENCY,
+        "completed": worker_state["completed"],
+        "failed": worker_state["failed"],
+        "rejected": worker_state["rejected"],
+    }
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("AI_SERVICE_PORT", "8001")))
@@ -1,21 +1,33 @@
 """
 图像预处理模块
 """
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import numpy as np
 from PIL import Image
 import mediapipe as mp
 from controlnet_aux import OpenposeDetector, CannyDetector
-from typing import Tuple, Optional, List
+from typing import Tuple, Optional, List, Callable, Any, Dict
 import dlib
 
 class ImageProcessor:
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None):
         # 初始化 MediaPipe
         self.mp_face_mesh = mp.solutions.face_mesh
         self.mp_pose = mp.solutions.pose
         self.mp_selfie_segmentation = mp.solutions.selfie_segmentation
         
+        # 批量处理线程池；MediaPipe 模型非线程安全，每个线程持有自己的实例
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._local = threading.local()
+        self._models_lock = threading.Lock()
+        self._models = []
+        self.last_batch_stats: Dict[str, Any] = {}
+        
         # 初始化 dlib 人脸检测器
         self.face_detector = dlib.get_frontal_face_detector()
         
@@ -30,42 +42,38 @@ class ImageProcessor:
         # 转换为 OpenCV 格式
         cv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
         
-        # 使用 MediaPipe 检测人脸
-        with self.mp_face_mesh.FaceMesh(
-            static_image_mode=True,
-            max_num_faces=1,
-            min_detection_confidence=0.5
-        ) as face_mesh:
-            results = face_mesh.process(cv2.cvtColor(cv_image, cv2.COLOR_BGR2RGB))
-            
-            if not results.multi_face_landmarks:
-                return None
-                
-            # 创建人脸 mask
-            h, w = cv_image.shape[:2]
-            mask = np.zeros((h, w), dtype=np.uint8)
-            
-            # 获取人脸关键点
-            face_landmarks = results.multi_face_landmarks[0]
-            points = []
-            for landmark in face_landmarks.landmark:
-                x = int(landmark.x * w)
-                y = int(landmark.y * h)
-                points.append([x, y])
-            
-            # 创建人脸轮廓
-            points = np.array(points, dtype=np.int32)
-            hull = cv2.convexHull(points)
-            cv2.fillPoly(mask, [hull], 255)
-            
-            # 膨胀 mask 以包含更多区域
-            kernel = np.ones((20, 20), np.uint8)
-            mask = cv2.dilate(mask, kernel, iterations=1)
-            
-            # 高斯模糊使边缘更自然
-            mask = cv2.GaussianBlur(mask, (21, 21), 0)
+        # 使用 MediaPipe 检测人脸（复用当前线程的模型实例）
+        face_mesh = self._get_face_mesh()
+        results = face_mesh.process(cv2.cvtColor(cv_image, cv2.COLOR_BGR2RGB))
+        
+        if not results.multi_face_landmarks:
+            return None
             
-            return Image.fromarray(mask)
+        # 创建人脸 mask
+        h, w = cv_image.shape[:2]
+        mask = np.zeros((h, w), dtype=np.uint8)
+        
+        # 获取人脸关键点
+        face_landmarks = results.multi_face_landmarks[0]
+        points = []
+        for landmark in face_landmarks.landmark:
+            x = int(landmark.x * w)
+            y = int(landmark.y * h)
+            points.append([x, y])
+        
+        # 创建人脸轮廓
+        points = np.array(points, dtype=np.int32)
+        hull = cv2.convexHull(points)
+        cv2.fillPoly(mask, [hull], 255)
+        
+        # 膨胀 mask 以包含更多区域
+        kernel = np.ones((20, 20), np.uint8)
+        mask = cv2.dilate(mask, kernel, iterations=1)
+        
+        # 高斯模糊使边缘更自然
+        mask = cv2.GaussianBlur(mask, (21, 21), 0)
+        
+        return Image.fromarray(mask)
     
     def detect_body_pose(self, image: Image.Image) -> Image.Image:
         """
@@ -81,30 +89,28 @@ class ImageProcessor:
         """
         cv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
         
-        # 使用 MediaPipe 进行人体分割
-        with self.mp_selfie_segmentation.SelfieSegmentation(
-            model_selection=1
-        ) as selfie_segmentation:
-            results = selfie_segmentation.process(cv2.cvtColor(cv_image, cv2.COLOR_BGR2RGB))
-            
-            # 获取分割 mask
-            condition = np.stack((results.segmentation_mask,) * 3, axis=-1) > 0.1
-            mask = np.where(condition, 255, 0).astype(np.uint8)
-            
-            # 只取单通道
-            mask = mask[:, :, 0]
-            
-            # 移除头部区域（保留身体）
-            face_mask = self.detect_face_region(image)
-            if face_mask is not None:
-                face_mask_np = np.array(face_mask)
-                # 扩大头部区域
-                kernel = np.ones((50, 50), np.uint8)
-                face_mask_np = cv2.dilate(face_mask_np, kernel, iterations=1)
-                # 从身体 mask 中减去头部
-                mask = cv2.subtract(mask, face_mask_np)
-            
-            return Image.fromarray(mask)
+        # 使用 MediaPipe 进行人体分割（复用当前线程的模型实例）
+        selfie_segmentation = self._get_selfie_segmentation()
+        results = selfie_segmentation.process(cv2.cvtColor(cv_image, cv2.COLOR_BGR2RGB))
+        
+        # 获取分割 mask
+        condition = np.stack((results.segmentation_mask,) * 3, axis=-1) > 0.1
+        mask = np.where(condition, 255, 0).astype(np.uint8)
+        
+        # 只取单通道
+        mask = mask[:, :, 0]
+        
+        # 移除头部区域（保留身体）
+        face_mask = self.detect_face_region(image)
+        if face_mask is not None:
+            face_mask_np = np.array(face_mask)
+            # 扩大头部区域
+            kernel = np.ones((50, 50), np.uint8)
+            face_mask_np = cv2.dilate(face_mask_np, kernel, iterations=1)
+            # 从身体 mask 中减去头部
+            mask = cv2.subtract(mask, face_mask_np)
+        
+        return Image.fromarray(mask)
     
     def enhance_image_quality(self, image: Image.Image) -> Image.Image:
         """
@@ -136,6 +142,98 @@ class ImageProcessor:
         
         return Image.fromarray(result)
     
+    def detect_face_regions(self, images: List[Image.Image]) -> List[Optional[Image.Image]]:
+        """
+        批量检测人脸区域 mask，结果顺序与输入一致
+        """
+        return self._map_batch("detect_face_regions", self.detect_face_region, images)
+    
+    def create_body_masks(self, images: List[Image.Image]) -> List[Optional[Image.Image]]:
+        """
+        批量创建身体区域 mask，结果顺序与输入一致
+        """
+        return self._map_batch("create_body_masks", self.create_body_mask, images)
+    
+    def enhance_images(self, images: List[Image.Image]) -> List[Image.Image]:
+        """
+        批量增强图像质量，结果顺序与输入一致
+        """
+        return self._map_batch("enhance_images", self.enhance_image_quality, images)
+    
+    def close(self):
+        """关闭线程池并释放各线程的 MediaPipe 模型"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._models_lock:
+            for model in self._models:
+                model.close()
+            self._models.clear()
+        self._local = threading.local()
+    
+    def _map_batch(
+        self,
+        operation: str,
+        func: Callable[[Image.Image], Any],
+        images: List[Image.Image]
+    ) -> List[Any]:
+        """
+        在线程池中并行处理一批图片（OpenCV / MediaPipe 计算时会释放 GIL），
+        并记录吞吐量到 last_batch_stats
+        """
+        images = list(images)
+        start = time.perf_counter()
+        
+        if len(images) <= 1 or self.max_workers == 1:
+            results = [func(image) for image in images]
+        else:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="image-processor"
+                )
+            results = list(self._executor.map(func, images))
+        
+        elapsed = time.perf_counter() - start
+        self.last_batch_stats = {
+            "operation": operation,
+            "count": len(images),
+            "workers": min(self.max_workers, max(len(images), 1)),
+            "seconds": elapsed,
+            "images_per_second": len(images) / elapsed if elapsed > 0 else 0.0,
+        }
+        print(
+            f"{operation}: {len(images)} 张图片, 用时 {elapsed:.2f}s, "
+            f"{self.last_batch_stats['images_per_second']:.1f} 张/秒"
+        )
+        return results
+    
+    def _get_face_mesh(self):
+        """获取当前线程的 FaceMesh 实例"""
+        face_mesh = getattr(self._local, "face_mesh", None)
+        if face_mesh is None:
+            face_mesh = self.mp_face_mesh.FaceMesh(
+                static_image_mode=True,
+                max_num_faces=1,
+                min_detection_confidence=0.5
+            )
+            self._local.face_mesh = face_mesh
+            with self._models_lock:
+                self._models.append(face_mesh)
+        return face_mesh
+    
+    def _get_selfie_segmentation(self):
+        """获取当前线程的 SelfieSegmentation 实例"""
+        selfie_segmentation = getattr(self._local, "selfie_segmentation", None)
+        if selfie_segmentation is None:
+            selfie_segmentation = self.mp_selfie_segmentation.SelfieSegmentation(
+                model_selection=1
+            )
+            self._local.selfie_segmentation = selfie_segmentation
+            with self._models_lock:
+                self._models.append(selfie_segmentation)
+        return selfie_segmentation
+    
     def resize_for_processing(
         self, 
         image: Image.Image, 
@@ -0,0 +1,43 @@
+"""
+去噪过程中间预览
+
+用线性近似把 SDXL latent 直接映射为 RGB，代替完整的 VAE 解码。
+得到的是 1/8 分辨率的粗略图像，仅用于进度预览。
+"""
+from typing import Optional
+
+import torch
+from PIL import Image
+
+# SDXL latent (4 通道) -> RGB 的线性近似系数
+SDXL_LATENT_RGB_FACTORS = [
+    [0.3651, 0.4232, 0.4341],
+    [-0.2533, -0.0042, 0.1068],
+    [0.1076, 0.1111, -0.0362],
+    [-0.3165, -0.2492, -0.2188],
+]
+SDXL_LATENT_RGB_BIAS = [0.1084, -0.0175, -0.0011]
+
+
+def latents_to_preview(latents: torch.Tensor, max_size: Optional[int] = 256) -> Image.Image:
+    """
+    将当前 latent 转为低分辨率预览图
+
+    Args:
+        latents: 形状为 (batch, 4, h, w) 的 latent，只取第一张
+        max_size: 预览图最长边，None 表示不缩放
+    """
+    latent = latents[0].detach().float()
+    factors = torch.tensor(SDXL_LATENT_RGB_FACTORS, device=latent.device)
+    bias = torch.tensor(SDXL_LATENT_RGB_BIAS, device=latent.device)
+
+    # (4, h, w) x (4, 3) -> (h, w, 3)
+    rgb = torch.einsum("chw,cr->hwr", latent, factors) + bias
+    rgb = ((rgb + 1.0) / 2.0).clamp(0, 1)
+    array = (rgb * 255).to(torch.uint8).cpu().numpy()
+
+    preview = Image.fromarray(array)
+    if max_size and max(preview.size) > max_size:
+        preview.thumbnail((max_size, max_size), Image.Resampling.BILINEAR)
+    return preview
+
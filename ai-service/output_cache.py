@@ -0,0 +1,115 @@
+"""
+扩散结果缓存
+
+以模型、管道、提示词、推理参数、seed 和输入图片哈希作为内容地址，
+把生成结果保存在磁盘上。相同请求直接返回缓存结果，跳过推理。
+缓存总大小超过上限时按最近访问时间（LRU）淘汰。
+"""
+import hashlib
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from PIL import Image
+
+
+def hash_image(image: Optional[Image.Image]) -> Optional[str]:
+    """计算图片像素内容的哈希（与文件格式无关）"""
+    if image is None:
+        return None
+    digest = hashlib.sha256()
+    digest.update(f"{image.mode}:{image.width}x{image.height}:".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def derive_seed(**fields: Any) -> int:
+    """由输入哈希和参数推导默认 seed，相同请求得到相同 seed"""
+    payload = json.dumps(fields, sort_keys=True, default=str).encode()
+    return int.from_bytes(hashlib.sha256(payload).digest()[:4], "big")
+
+
+class OutputCache:
+    def __init__(self, cache_dir: str, max_bytes: int = 2 * 1024 ** 3):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # 不同管道的推理可能在多个线程中同时读写缓存
+        self._lock = threading.Lock()
+        self._total_bytes = sum(path.stat().st_size for path in self._entries())
+
+    @staticmethod
+    def make_key(**fields: Any) -> str:
+        """根据请求字段生成缓存 key"""
+        payload = json.dumps(fields, sort_keys=True, default=str).encode()
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, key: str) -> Optional[Image.Image]:
+        """读取缓存结果，命中时刷新访问时间"""
+        path = self._path(key)
+        try:
+            image = Image.open(path)
+            image.load()
+            os.utime(path)
+        except (FileNotFoundError, OSError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return image
+
+    def put(self, key: str, image: Image.Image):
+        """写入缓存（先写临时文件再原子替换），必要时淘汰旧条目"""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        image.save(tmp_path, "PNG")
+        previous_size = path.stat().st_size if path.exists() else 0
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._total_bytes += path.stat().st_size - previous_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.png"
+
+    def _entries(self):
+        return self.cache_dir.glob("*/*.png")
+
+    def _evict(self):
+        """按访问时间从旧到新删除，直到总大小降到上限的 90%"""
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        self._total_bytes = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if self._total_bytes <= target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            self._total_bytes -= size
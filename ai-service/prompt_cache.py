@@ -0,0 +1,101 @@
+"""
+提示词 Embedding 缓存
+
+SDXL 每次调用都会重新运行两个文本编码器。服务内置的提示词只有几十种组合，
+因此在模型加载后一次性预计算它们的 embedding（包括 pooled embedding），
+自定义提示词则放入容量有限的 LRU 缓存。
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+import torch
+
+# 传给 SDXL 管道的 embedding 参数名
+EMBEDDING_KEYS = (
+    "prompt_embeds",
+    "negative_prompt_embeds",
+    "pooled_prompt_embeds",
+    "negative_pooled_prompt_embeds",
+)
+
+
+class PromptEmbeddingCache:
+    def __init__(self, max_custom_entries: int = 64):
+        self.max_custom_entries = max_custom_entries
+        # 预计算的内置提示词，常驻不淘汰
+        self._fixed: Dict[Tuple[str, str, str], Dict[str, torch.Tensor]] = {}
+        # 自定义提示词，按最近使用顺序淘汰
+        self._custom: "OrderedDict[Tuple[str, str, str], Dict[str, torch.Tensor]]" = OrderedDict()
+        # 多个管道可能在不同线程中同时访问缓存
+        self._lock = threading.Lock()
+
+    def precompute(
+        self,
+        pipeline_name: str,
+        pipeline,
+        prompt_pairs: Iterable[Tuple[str, str]]
+    ):
+        """为一组 (prompt, negative_prompt) 预计算 embedding"""
+        for prompt, negative_prompt in prompt_pairs:
+            key = (pipeline_name, prompt, negative_prompt)
+            if key not in self._fixed:
+                self._fixed[key] = self._encode(pipeline, prompt, negative_prompt)
+
+    def get(
+        self,
+        pipeline_name: str,
+        pipeline,
+        prompt: str,
+        negative_prompt: str
+    ) -> Dict[str, torch.Tensor]:
+        """
+        获取提示词的 embedding，返回可直接作为管道参数的字典
+        """
+        key = (pipeline_name, prompt, negative_prompt)
+
+        embeds = self._fixed.get(key)
+        if embeds is not None:
+            return embeds
+
+        with self._lock:
+            embeds = self._custom.get(key)
+            if embeds is not None:
+                self._custom.move_to_end(key)
+                return embeds
+
+        # 编码在锁外进行，不阻塞其他管道
+        embeds = self._encode(pipeline, prompt, negative_prompt)
+        with self._lock:
+            self._custom[key] = embeds
+            if len(self._custom) > self.max_custom_entries:
+                self._custom.popitem(last=False)
+        return embeds
+
+    def clear(self, pipeline_name: Optional[str] = None):
+        """清空缓存（指定管道名时只清除该管道的条目）"""
+        with self._lock:
+            if pipeline_name is None:
+                self._fixed.clear()
+                self._custom.clear()
+                return
+
+            for cache in (self._fixed, self._custom):
+                for key in [k for k in cache if k[0] == pipeline_name]:
+                    del cache[key]
+
+    def __len__(self) -> int:
+        return len(self._fixed) + len(self._custom)
+
+    @staticmethod
+    def _encode(pipeline, prompt: str, negative_prompt: str) -> Dict[str, torch.Tensor]:
+        """运行 SDXL 的两个文本编码器"""
+        with torch.no_grad():
+            embeds = pipeline.encode_prompt(
+                prompt=prompt,
+                device=pipeline._execution_device,
+                num_images_per_prompt=1,
+                do_classifier_free_guidance=True,
+                negative_prompt=negative_prompt,
+            )
+        return dict(zip(EMBEDDING_KEYS, embeds))
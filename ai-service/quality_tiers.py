@@ -0,0 +1,54 @@
+"""
+质量档位配置
+
+每个档位为每种操作指定推理步数、调度器、最大分辨率和 guidance scale。
+preview 用于交互式预览，standard 与原有默认参数一致，final 用于最终出图。
+"""
+from typing import Dict, Any
+
+DEFAULT_QUALITY = "standard"
+
+# 调度器名称 -> (diffusers 调度器类名, 额外配置)；"default" 表示保留管道自带的调度器
+# 类名在创建时才解析，读取档位配置不需要 torch / diffusers
+SCHEDULERS = {
+    "dpmpp_2m_karras": ("DPMSolverMultistepScheduler", {"use_karras_sigmas": True}),
+    "euler_a": ("EulerAncestralDiscreteScheduler", {}),
+    "unipc": ("UniPCMultistepScheduler", {}),
+}
+
+# max_size 为 None 时按原图分辨率处理
+QUALITY_TIERS: Dict[str, Dict[str, Dict[str, Any]]] = {
+    "preview": {
+        "face_slim": {"steps": 12, "scheduler": "dpmpp_2m_karras", "max_size": 768, "guidance_scale": 5.0},
+        "body_slim": {"steps": 12, "scheduler": "dpmpp_2m_karras", "max_size": 768, "guidance_scale": 5.0},
+        "beauty_filter": {"steps": 8, "scheduler": "dpmpp_2m_karras", "max_size": 768, "guidance_scale": 5.0},
+    },
+    "standard": {
+        "face_slim": {"steps": 30, "scheduler": "default", "max_size": None, "guidance_scale": 7.5},
+        "body_slim": {"steps": 30, "scheduler": "default", "max_size": None, "guidance_scale": 7.5},
+        "beauty_filter": {"steps": 20, "scheduler": "default", "max_size": None, "guidance_scale": 7.5},
+    },
+    "final": {
+        "face_slim": {"steps": 40, "scheduler": "dpmpp_2m_karras", "max_size": None, "guidance_scale": 7.5},
+        "body_slim": {"steps": 40, "scheduler": "dpmpp_2m_karras", "max_size": None, "guidance_scale": 7.5},
+        "beauty_filter": {"steps": 30, "scheduler": "dpmpp_2m_karras", "max_size": None, "guidance_scale": 7.5},
+    },
+}
+
+
+def get_tier_settings(quality: str, operation: str) -> Dict[str, Any]:
+    """获取指定档位下某个操作的参数"""
+    if quality not in QUALITY_TIERS:
+        raise ValueError(
+            f"未知的质量档位: {quality}，可选: {', '.join(QUALITY_TIERS)}"
+        )
+    return QUALITY_TIERS[quality][operation]
+
+
+def create_scheduler(name: str, base_config):
+    """根据名称和管道原有调度器配置创建调度器"""
+    import diffusers
+
+    class_name, overrides = SCHEDULERS[name]
+    scheduler_cls = getattr(diffusers, class_name)
+    return scheduler_cls.from_config(base_config, **overrides)
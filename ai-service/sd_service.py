@@ -4,6 +4,7 @@ Stable Diffusion 服务封装
 import torch
 from diffusers import (
     StableDiffusionXLPipeline,
+    StableDiffusionXLImg2ImgPipeline,
     StableDiffusionXLInpaintPipeline,
     ControlNetModel,
     StableDiffusionXLControlNetPipeline,
@@ -11,37 +12,126 @@ from diffusers import (
 )
 from PIL import Image
 import numpy as np
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple, Callable
 import os
+import threading
+
+from prompt_cache import PromptEmbeddingCache
+from quality_tiers import DEFAULT_QUALITY, get_tier_settings, create_scheduler
+from latent_preview import latents_to_preview
+from output_cache import OutputCache, hash_image, derive_seed
+
+# 模型 ID（用于加载和结果缓存 key）
+SDXL_BASE_MODEL_ID = "stabilityai/stable-diffusion-xl-base-1.0"
+SDXL_VAE_MODEL_ID = "madebyollin/sdxl-vae-fp16-fix"
+OPENPOSE_CONTROLNET_MODEL_ID = "thibaud/controlnet-openpose-sdxl-1.0"
+SDXL_INPAINT_MODEL_ID = "diffusers/stable-diffusion-xl-1.0-inpainting-0.1"
+
+MODEL_IDS = {
+    "base": f"{SDXL_BASE_MODEL_ID}+{SDXL_VAE_MODEL_ID}",
+    "img2img": f"{SDXL_BASE_MODEL_ID}+{SDXL_VAE_MODEL_ID}",
+    "openpose": f"{SDXL_BASE_MODEL_ID}+{OPENPOSE_CONTROLNET_MODEL_ID}",
+    "inpaint": SDXL_INPAINT_MODEL_ID,
+}
+
+# 进度回调: (当前步数, 总步数, 预览图或 None)
+ProgressCallback = Callable[[int, int, Optional[Image.Image]], None]
+
+# 负面提示词
+FACE_SLIM_NEGATIVE_PROMPT = "deformed, ugly, bad anatomy, bad face"
+BODY_SLIM_NEGATIVE_PROMPT = "deformed body, bad anatomy, extra limbs"
+BEAUTY_NEGATIVE_PROMPT = "over-processed, artificial looking, plastic skin"
+
+# 正面提示词：基础描述 + 按强度等级追加的描述
+FACE_SLIM_BASE_PROMPT = "beautiful face, slim face, v-shaped face, defined jawline"
+FACE_SLIM_LEVEL_PROMPTS = {
+    "high": "very slim face, sharp chin",
+    "medium": "moderately slim face",
+    "low": "naturally slim face",
+}
+
+BODY_SLIM_BASE_PROMPT = "fit body, slim figure, proportional body"
+BODY_SLIM_LEVEL_PROMPTS = {
+    "high": "very slim body, model figure",
+    "medium": "athletic body, toned figure",
+    "low": "naturally slim body",
+}
+
+BEAUTY_FILTER_PROMPTS = {
+    "natural": "natural beauty, healthy skin, soft lighting",
+    "glamour": "glamorous, professional photography, studio lighting",
+    "fresh": "fresh looking, youthful, bright skin",
+    "artistic": "artistic portrait, creative lighting, aesthetic"
+}
+BEAUTY_LEVEL_PROMPTS = {
+    "high": "flawless skin, perfect complexion",
+    "medium": "smooth skin, even skin tone",
+    "low": "subtle enhancement",
+}
+
+
+def _intensity_level(intensity: float) -> str:
+    """将强度 (0-1) 映射为提示词等级"""
+    if intensity > 0.7:
+        return "high"
+    elif intensity > 0.4:
+        return "medium"
+    else:
+        return "low"
+
 
 class StableDiffusionService:
-    def __init__(self, model_path: str = "./models/stable-diffusion"):
+    def __init__(
+        self,
+        model_path: str = "./models/stable-diffusion",
+        max_custom_prompt_embeddings: int = 64,
+        output_cache_dir: Optional[str] = "./cache/outputs",
+        output_cache_max_bytes: int = 2 * 1024 ** 3
+    ):
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.model_path = model_path
         self.pipelines = {}
+        self.prompt_cache = PromptEmbeddingCache(max_custom_prompt_embeddings)
+        # 管道自带的调度器，以及按档位创建过的调度器
+        self._default_schedulers = {}
+        self._schedulers = {}
+        # 每个管道一把锁
+        self._pipeline_locks: Dict[str, threading.Lock] = {}
+        self._pipeline_locks_guard = threading.Lock()
+        # 结果缓存（output_cache_dir 为 None 时关闭）
+        self.output_cache = (
+            OutputCache(output_cache_dir, output_cache_max_bytes)
+            if output_cache_dir else None
+        )
         
     def load_base_model(self):
-        """加载基础 SDXL 模型"""
+        """加载基础 SDXL 模型，以及共享其权重的 img2img 管道（美颜使用）"""
         print("正在加载 Stable Diffusion XL 模型...")
         
         # 加载 VAE
         vae = AutoencoderKL.from_pretrained(
-            "madebyollin/sdxl-vae-fp16-fix", 
+            SDXL_VAE_MODEL_ID, 
             torch_dtype=torch.float16
         )
         
         # 加载主模型
         self.pipelines['base'] = StableDiffusionXLPipeline.from_pretrained(
-            "stabilityai/stable-diffusion-xl-base-1.0",
+            SDXL_BASE_MODEL_ID,
             vae=vae,
             torch_dtype=torch.float16,
             use_safetensors=True,
             variant="fp16"
         ).to(self.device)
         
-        # 启用内存优化
-        self.pipelines['base'].enable_model_cpu_offload()
-        self.pipelines['base'].enable_vae_slicing()
+        # img2img 管道复用基础模型的组件，不额外占用显存
+        self.pipelines['img2img'] = StableDiffusionXLImg2ImgPipeline.from_pipe(
+            self.pipelines['base']
+        )
+        
+        # 启用内存优化（offload hook 挂在共享组件上，对实际使用的 img2img 管道开启）
+        self.pipelines['img2img'].enable_model_cpu_offload()
+        self.pipelines['img2img'].enable_vae_slicing()
+        self._precompute_prompt_embeddings('img2img')
         
     def load_controlnet_models(self):
         """加载 ControlNet 模型"""
@@ -49,33 +139,41 @@ class StableDiffusionService:
         
         # OpenPose ControlNet (身体姿态控制)
         openpose_controlnet = ControlNetModel.from_pretrained(
-            "thibaud/controlnet-openpose-sdxl-1.0",
+            OPENPOSE_CONTROLNET_MODEL_ID,
             torch_dtype=torch.float16
         )
         
         self.pipelines['openpose'] = StableDiffusionXLControlNetPipeline.from_pretrained(
-            "stabilityai/stable-diffusion-xl-base-1.0",
+            SDXL_BASE_MODEL_ID,
             controlnet=openpose_controlnet,
             torch_dtype=torch.float16,
             use_safetensors=True,
             variant="fp16"
         ).to(self.device)
+        self._precompute_prompt_embeddings('openpose')
         
     def load_inpaint_model(self):
         """加载 Inpainting 模型（局部修改）"""
         print("正在加载 Inpainting 模型...")
         
         self.pipelines['inpaint'] = StableDiffusionXLInpaintPipeline.from_pretrained(
-            "diffusers/stable-diffusion-xl-1.0-inpainting-0.1",
+            SDXL_INPAINT_MODEL_ID,
             torch_dtype=torch.float16,
             variant="fp16"
         ).to(self.device)
+        self._precompute_prompt_embeddings('inpaint')
         
     def face_slimming(
         self,
         image: Image.Image,
         mask: Optional[Image.Image] = None,
         intensity: float = 0.5,
+        prompt: Optional[str] = None,
+        negative_prompt: Optional[str] = None,
+        quality: str = DEFAULT_QUALITY,
+        seed: Optional[int] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        preview_interval: int = 5,
         **kwargs
     ) -> Image.Image:
         """
@@ -85,35 +183,67 @@ class StableDiffusionService:
             image: 输入图片
             mask: 脸部区域mask
             intensity: 瘦脸强度 (0-1)
+            prompt: 自定义提示词（默认按强度生成）
+            negative_prompt: 自定义负面提示词
+            quality: 质量档位 (preview / standard / final)
+            seed: 随机种子（默认由输入图片和参数推导）
+            progress_callback: 每步去噪后的进度回调
+            preview_interval: 每隔多少步生成一次预览图（0 表示不生成）
         """
         # 生成瘦脸提示词
-        prompt = self._generate_face_slim_prompt(intensity)
-        negative_prompt = "deformed, ugly, bad anatomy, bad face"
+        prompt = prompt or self._generate_face_slim_prompt(intensity)
+        negative_prompt = negative_prompt or FACE_SLIM_NEGATIVE_PROMPT
+        settings = get_tier_settings(quality, 'face_slim')
+        params = {
+            "prompt": prompt,
+            "negative_prompt": negative_prompt,
+            "strength": 0.3 + intensity * 0.4,  # 调整强度
+            **settings,
+        }
         
-        # 使用 inpainting 进行局部修改
-        if 'inpaint' not in self.pipelines:
-            self.load_inpaint_model()
+        def generate(generator: torch.Generator) -> Image.Image:
+            # diffusers 管道非线程安全，且调度器按档位切换，同一管道串行执行
+            with self._pipeline_lock('inpaint'):
+                # 使用 inpainting 进行局部修改
+                if 'inpaint' not in self.pipelines:
+                    self.load_inpaint_model()
+                self._apply_scheduler('inpaint', settings['scheduler'])
             
-        result = self.pipelines['inpaint'](
-            prompt=prompt,
-            negative_prompt=negative_prompt,
-            image=image,
-            mask_image=mask,
-            height=image.height,
-            width=image.width,
-            strength=0.3 + intensity * 0.4,  # 调整强度
-            guidance_scale=7.5,
-            num_inference_steps=30,
-            **kwargs
-        ).images[0]
+                work_image = self._fit_resolution(image, settings['max_size'])
+                work_mask = mask
+                if work_mask is not None:
+                    work_mask = work_mask.resize(work_image.size, Image.Resampling.LANCZOS)
+                
+                result = self.pipelines['inpaint'](
+                    **self._get_prompt_embeddings('inpaint', prompt, negative_prompt),
+                    image=work_image,
+                    mask_image=work_mask,
+                    height=work_image.height,
+                    width=work_image.width,
+                    strength=params['strength'],
+                    guidance_scale=settings['guidance_scale'],
+                    num_inference_steps=settings['steps'],
+                    generator=generator,
+                    **self._make_step_callback(progress_callback, preview_interval),
+                    **kwargs
+                ).images[0]
+            return self._restore_resolution(result, image)
         
-        return result
+        return self._generate_cached(
+            'inpaint', params, {"image": image, "mask": mask}, seed, kwargs, generate
+        )
     
     def body_slimming(
         self,
         image: Image.Image,
         pose_image: Optional[Image.Image] = None,
         intensity: float = 0.5,
+        prompt: Optional[str] = None,
+        negative_prompt: Optional[str] = None,
+        quality: str = DEFAULT_QUALITY,
+        seed: Optional[int] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        preview_interval: int = 5,
         **kwargs
     ) -> Image.Image:
         """
@@ -123,34 +253,66 @@ class StableDiffusionService:
             image: 输入图片
             pose_image: OpenPose 骨架图
             intensity: 瘦身强度 (0-1)
+            prompt: 自定义提示词（默认按强度生成）
+            negative_prompt: 自定义负面提示词
+            quality: 质量档位 (preview / standard / final)
+            seed: 随机种子（默认由输入图片和参数推导）
+            progress_callback: 每步去噪后的进度回调
+            preview_interval: 每隔多少步生成一次预览图（0 表示不生成）
         """
         # 生成瘦身提示词
-        prompt = self._generate_body_slim_prompt(intensity)
-        negative_prompt = "deformed body, bad anatomy, extra limbs"
+        prompt = prompt or self._generate_body_slim_prompt(intensity)
+        negative_prompt = negative_prompt or BODY_SLIM_NEGATIVE_PROMPT
+        settings = get_tier_settings(quality, 'body_slim')
+        params = {
+            "prompt": prompt,
+            "negative_prompt": negative_prompt,
+            "controlnet_conditioning_scale": 0.5 + intensity * 0.3,
+            **settings,
+        }
         
-        # 使用 ControlNet 进行姿态控制的图像生成
-        if 'openpose' not in self.pipelines:
-            self.load_controlnet_models()
+        def generate(generator: torch.Generator) -> Image.Image:
+            # diffusers 管道非线程安全，且调度器按档位切换，同一管道串行执行
+            with self._pipeline_lock('openpose'):
+                # 使用 ControlNet 进行姿态控制的图像生成
+                if 'openpose' not in self.pipelines:
+                    self.load_controlnet_models()
+                self._apply_scheduler('openpose', settings['scheduler'])
             
-        result = self.pipelines['openpose'](
-            prompt=prompt,
-            negative_prompt=negative_prompt,
-            image=pose_image,
-            height=image.height,
-            width=image.width,
-            guidance_scale=7.5,
-            num_inference_steps=30,
-            controlnet_conditioning_scale=0.5 + intensity * 0.3,
-            **kwargs
-        ).images[0]
+                work_image = self._fit_resolution(image, settings['max_size'])
+                work_pose = pose_image
+                if work_pose is not None:
+                    work_pose = work_pose.resize(work_image.size, Image.Resampling.LANCZOS)
+                
+                result = self.pipelines['openpose'](
+                    **self._get_prompt_embeddings('openpose', prompt, negative_prompt),
+                    image=work_pose,
+                    height=work_image.height,
+                    width=work_image.width,
+                    guidance_scale=settings['guidance_scale'],
+                    num_inference_steps=settings['steps'],
+                    controlnet_conditioning_scale=params['controlnet_conditioning_scale'],
+                    generator=generator,
+                    **self._make_step_callback(progress_callback, preview_interval),
+                    **kwargs
+                ).images[0]
+            return self._restore_resolution(result, image)
         
-        return result
+        return self._generate_cached(
+            'openpose', params, {"image": image, "pose": pose_image}, seed, kwargs, generate
+        )
     
     def apply_beauty_filter(
         self,
         image: Image.Image,
         filter_type: str = "natural",
         intensity: float = 0.5,
+        prompt: Optional[str] = None,
+        negative_prompt: Optional[str] = None,
+        quality: str = DEFAULT_QUALITY,
+        seed: Optional[int] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        preview_interval: int = 5,
         **kwargs
     ) -> Image.Image:
         """
@@ -160,61 +322,221 @@ class StableDiffusionService:
             image: 输入图片
             filter_type: 滤镜类型
             intensity: 滤镜强度
+            prompt: 自定义提示词（默认按滤镜类型和强度生成）
+            negative_prompt: 自定义负面提示词
+            quality: 质量档位 (preview / standard / final)
+            seed: 随机种子（默认由输入图片和参数推导）
+            progress_callback: 每步去噪后的进度回调
+            preview_interval: 每隔多少步生成一次预览图（0 表示不生成）
         """
         # 根据滤镜类型生成提示词
-        prompt = self._generate_beauty_prompt(filter_type, intensity)
-        negative_prompt = "over-processed, artificial looking, plastic skin"
+        prompt = prompt or self._generate_beauty_prompt(filter_type, intensity)
+        negative_prompt = negative_prompt or BEAUTY_NEGATIVE_PROMPT
+        settings = get_tier_settings(quality, 'beauty_filter')
+        params = {
+            "prompt": prompt,
+            "negative_prompt": negative_prompt,
+            "strength": 0.2 + intensity * 0.3,
+            **settings,
+        }
         
-        if 'base' not in self.pipelines:
-            self.load_base_model()
+        def generate(generator: torch.Generator) -> Image.Image:
+            # diffusers 管道非线程安全，且调度器按档位切换，同一管道串行执行
+            with self._pipeline_lock('img2img'):
+                if 'img2img' not in self.pipelines:
+                    self.load_base_model()
+                self._apply_scheduler('img2img', settings['scheduler'])
             
-        # 使用 img2img 模式
-        result = self.pipelines['base'].img2img(
-            prompt=prompt,
-            negative_prompt=negative_prompt,
-            image=image,
-            strength=0.2 + intensity * 0.3,
-            guidance_scale=7.5,
-            num_inference_steps=20,
-            **kwargs
-        ).images[0]
+                work_image = self._fit_resolution(image, settings['max_size'])
+                
+                # 使用 img2img 模式
+                result = self.pipelines['img2img'](
+                    **self._get_prompt_embeddings('img2img', prompt, negative_prompt),
+                    image=work_image,
+                    strength=params['strength'],
+                    guidance_scale=settings['guidance_scale'],
+                    num_inference_steps=settings['steps'],
+                    generator=generator,
+                    **self._make_step_callback(progress_callback, preview_interval),
+                    **kwargs
+                ).images[0]
+            return self._restore_resolution(result, image)
+        
+        return self._generate_cached(
+            'img2img', params, {"image": image}, seed, kwargs, generate
+        )
+    
+    def _generate_cached(
+        self,
+        pipeline_name: str,
+        params: Dict[str, Any],
+        inputs: Dict[str, Optional[Image.Image]],
+        seed: Optional[int],
+        extra_kwargs: Dict[str, Any],
+        generate: Callable[[torch.Generator], Image.Image]
+    ) -> Image.Image:
+        """
+        以固定 seed 执行推理，并按内容地址缓存结果
+        
+        缓存 key 包含模型 ID、管道类型、提示词、推理参数、seed 和输入图片哈希，
+        命中时不加载模型、不推理。
+        """
+        input_hashes = {f"{name}_hash": hash_image(img) for name, img in inputs.items()}
+        if seed is None:
+            seed = derive_seed(pipeline=pipeline_name, **params, **input_hashes)
+        
+        # 额外的管道参数无法可靠地计入 key，此时不走缓存
+        cache = self.output_cache if not extra_kwargs else None
+        key = None
+        if cache is not None:
+            key = OutputCache.make_key(
+                model_id=MODEL_IDS[pipeline_name],
+                pipeline=pipeline_name,
+                seed=seed,
+                **params,
+                **input_hashes
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        
+        generator = torch.Generator(device="cpu").manual_seed(seed)
+        result = generate(generator)
         
+        if cache is not None:
+            cache.put(key, result)
         return result
     
-    def _generate_face_slim_prompt(self, intensity: float) -> str:
-        """生成瘦脸提示词"""
-        base_prompt = "beautiful face, slim face, v-shaped face, defined jawline"
-        if intensity > 0.7:
-            return f"{base_prompt}, very slim face, sharp chin"
-        elif intensity > 0.4:
-            return f"{base_prompt}, moderately slim face"
+    def _pipeline_lock(self, pipeline_name: str) -> threading.Lock:
+        """获取管道对应的锁（加载、切换调度器和推理都在锁内完成）"""
+        with self._pipeline_locks_guard:
+            if pipeline_name not in self._pipeline_locks:
+                self._pipeline_locks[pipeline_name] = threading.Lock()
+            return self._pipeline_locks[pipeline_name]
+    
+    def _apply_scheduler(self, pipeline_name: str, scheduler_name: str):
+        """按质量档位切换管道调度器"""
+        pipeline = self.pipelines[pipeline_name]
+        
+        if pipeline_name not in self._default_schedulers:
+            self._default_schedulers[pipeline_name] = pipeline.scheduler
+        default_scheduler = self._default_schedulers[pipeline_name]
+        
+        if scheduler_name == 'default':
+            pipeline.scheduler = default_scheduler
         else:
-            return f"{base_prompt}, naturally slim face"
+            key = (pipeline_name, scheduler_name)
+            if key not in self._schedulers:
+                self._schedulers[key] = create_scheduler(
+                    scheduler_name, default_scheduler.config
+                )
+            pipeline.scheduler = self._schedulers[key]
+    
+    def _fit_resolution(self, image: Image.Image, max_size: Optional[int]) -> Image.Image:
+        """按档位限制分辨率，并对齐到 8 的倍数（VAE 下采样要求）"""
+        w, h = image.size
+        scale = 1.0
+        if max_size and max(w, h) > max_size:
+            scale = max_size / max(w, h)
+        
+        new_w = max(8, int(w * scale) // 8 * 8)
+        new_h = max(8, int(h * scale) // 8 * 8)
+        if (new_w, new_h) == (w, h):
+            return image
+        return image.resize((new_w, new_h), Image.Resampling.LANCZOS)
     
+    def _restore_resolution(self, result: Image.Image, original: Image.Image) -> Image.Image:
+        """将结果恢复到原图尺寸"""
+        if result.size != original.size:
+            return result.resize(original.size, Image.Resampling.LANCZOS)
+        return result
+
+    def _make_step_callback(
+        self,
+        progress_callback: Optional[ProgressCallback],
+        preview_interval: int
+    ) -> Dict[str, Any]:
+        """构造 diffusers 的 callback_on_step_end 参数，上报真实步数和中间预览"""
+        if progress_callback is None:
+            return {}
+        
+        def on_step_end(pipeline, step, timestep, callback_kwargs):
+            # img2img / inpaint 的实际步数由 strength 决定，以管道统计为准
+            total_steps = pipeline.num_timesteps
+            current_step = step + 1
+            preview = None
+            if (
+                preview_interval
+                and current_step % preview_interval == 0
+                and current_step < total_steps
+            ):
+                preview = latents_to_preview(callback_kwargs["latents"])
+            progress_callback(current_step, total_steps, preview)
+            return callback_kwargs
+        
+        return {
+            "callback_on_step_end": on_step_end,
+            "callback_on_step_end_tensor_inputs": ["latents"],
+        }
+
+    def _get_prompt_embeddings(
+        self,
+        pipeline_name: str,
+        prompt: str,
+        negative_prompt: str
+    ) -> Dict[str, torch.Tensor]:
+        """获取提示词 embedding（内置提示词已预计算，自定义提示词走 LRU 缓存）"""
+        return self.prompt_cache.get(
+            pipeline_name,
+            self.pipelines[pipeline_name],
+            prompt,
+            negative_prompt
+        )
+
+    def _precompute_prompt_embeddings(self, pipeline_name: str):
+        """为管道对应的全部内置提示词预计算 embedding"""
+        pairs = self._builtin_prompt_pairs(pipeline_name)
+        print(f"正在预计算 {len(pairs)} 组提示词 embedding ({pipeline_name})...")
+        self.prompt_cache.precompute(pipeline_name, self.pipelines[pipeline_name], pairs)
+
+    def _builtin_prompt_pairs(self, pipeline_name: str) -> List[Tuple[str, str]]:
+        """列出管道可能用到的全部 (prompt, negative_prompt) 组合"""
+        if pipeline_name == 'inpaint':
+            return [
+                (self._generate_face_slim_prompt_for_level(level), FACE_SLIM_NEGATIVE_PROMPT)
+                for level in FACE_SLIM_LEVEL_PROMPTS
+            ]
+        elif pipeline_name == 'openpose':
+            return [
+                (self._generate_body_slim_prompt_for_level(level), BODY_SLIM_NEGATIVE_PROMPT)
+                for level in BODY_SLIM_LEVEL_PROMPTS
+            ]
+        elif pipeline_name == 'img2img':
+            return [
+                (self._generate_beauty_prompt_for_level(filter_type, level), BEAUTY_NEGATIVE_PROMPT)
+                for filter_type in BEAUTY_FILTER_PROMPTS
+                for level in BEAUTY_LEVEL_PROMPTS
+            ]
+        return []
+
+    def _generate_face_slim_prompt(self, intensity: float) -> str:
+        """生成瘦脸提示词"""
+        return self._generate_face_slim_prompt_for_level(_intensity_level(intensity))
+
     def _generate_body_slim_prompt(self, intensity: float) -> str:
         """生成瘦身提示词"""
-        base_prompt = "fit body, slim figure, proportional body"
-        if intensity > 0.7:
-            return f"{base_prompt}, very slim body, model figure"
-        elif intensity > 0.4:
-            return f"{base_prompt}, athletic body, toned figure"
-        else:
-            return f"{base_prompt}, naturally slim body"
-    
+        return self._generate_body_slim_prompt_for_level(_intensity_level(intensity))
+
     def _generate_beauty_prompt(self, filter_type: str, intensity: float) -> str:
         """生成美颜提示词"""
-        filters = {
-            "natural": "natural beauty, healthy skin, soft lighting",
-            "glamour": "glamorous, professional photography, studio lighting",
-            "fresh": "fresh looking, youthful, bright skin",
-            "artistic": "artistic portrait, creative lighting, aesthetic"
-        }
-        
-        base_prompt = filters.get(filter_type, filters["natural"])
-        
-        if intensity > 0.7:
-            return f"{base_prompt}, flawless skin, perfect complexion"
-        elif intensity > 0.4:
-            return f"{base_prompt}, smooth skin, even skin tone"
-        else:
-            return f"{base_prompt}, subtle enhancement"
\ No newline at end of file
+        return self._generate_beauty_prompt_for_level(filter_type, _intensity_level(intensity))
+
+    def _generate_face_slim_prompt_for_level(self, level: str) -> str:
+        return f"{FACE_SLIM_BASE_PROMPT}, {FACE_SLIM_LEVEL_PROMPTS[level]}"
+
+    def _generate_body_slim_prompt_for_level(self, level: str) -> str:
+        return f"{BODY_SLIM_BASE_PROMPT}, {BODY_SLIM_LEVEL_PROMPTS[level]}"
+
+    def _generate_beauty_prompt_for_level(self, filter_type: str, level: str) -> str:
+        base_prompt = BEAUTY_FILTER_PROMPTS.get(filter_type, BEAUTY_FILTER_PROMPTS["natural"])
+        return f"{base_prompt}, {BEAUTY_LEVEL_PROMPTS[level]}"
@@ -0,0 +1,153 @@
+"""
+AI Worker 接口测试（使用 stub 后端，不需要 GPU）
+"""
+import io
+import json
+import time
+from contextlib import contextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import api_server
+
+
+def make_image_bytes(size=(64, 48)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (120, 80, 60)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def start_client(monkeypatch, tmp_path):
+    """启动使用 stub 后端的服务，等待模型就绪后返回 TestClient"""
+    @contextmanager
+    def start(queue_size=8, steps=4, step_delay=0.0):
+        monkeypatch.setenv("AI_BACKEND", "stub")
+        monkeypatch.setenv("AI_STUB_STEPS", str(steps))
+        monkeypatch.setenv("AI_STUB_STEP_DELAY", str(step_delay))
+        monkeypatch.setattr(api_server, "QUEUE_SIZE", queue_size)
+        monkeypatch.setattr(api_server, "RESULT_DIR", tmp_path / "results")
+        api_server.jobs.clear()
+        api_server.worker_state.update(
+            backend=None, ready=False, error=None,
+            running=0, completed=0, failed=0, rejected=0
+        )
+
+        with TestClient(api_server.app) as client:
+            deadline = time.time() + 5
+            while client.get("/ready").status_code != 200:
+                assert time.time() < deadline, "stub 后端未能就绪"
+                time.sleep(0.01)
+            yield client
+
+    return start
+
+
+def submit(client, operations, quality="standard"):
+    return client.post(
+        "/api/jobs",
+        files={"file": ("test.png", make_image_bytes(), "image/png")},
+        data={"operations": json.dumps(operations), "quality": quality},
+    )
+
+
+def wait_for_job(client, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while True:
+        job = client.get(f"/api/jobs/{job_id}").json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        assert time.time() < deadline, f"任务超时: {job}"
+        time.sleep(0.01)
+
+
+def test_job_reports_progress_and_result(start_client):
+    with start_client(steps=3) as client:
+        response = submit(client, [
+            {"type": "face_slim", "intensity": 0.5},
+            {"type": "beauty_filter", "filter_type": "fresh", "intensity": 0.3},
+        ])
+        assert response.status_code == 202
+        job = wait_for_job(client, response.json()["job_id"])
+
+        assert job["status"] == "completed"
+        assert job["progress"] == 100
+        assert job["operation_index"] == 1
+        assert job["step"] == job["total_steps"] == 3
+        assert job["preview"].startswith("data:image/jpeg;base64,")
+        assert job["error"] is None
+
+        result = client.get(f"/api/jobs/{job['job_id']}/result")
+        assert result.status_code == 200
+        assert result.headers["content-type"] == "image/png"
+        image = Image.open(io.BytesIO(result.content))
+        # face_slim 按强度收窄宽度
+        assert image.size == (int(64 * (1 - 0.5 * 0.05)), 48)
+
+
+def test_queue_full_returns_503_with_retry_after(start_client):
+    with start_client(queue_size=1, steps=20, step_delay=0.05) as client:
+        operations = [{"type": "body_slim", "intensity": 0.5}]
+        # 第一个任务被取出执行，第二个占满队列
+        first = submit(client, operations)
+        assert first.status_code == 202
+        deadline = time.time() + 5
+        while client.get(f"/api/jobs/{first.json()['job_id']}").json()["status"] == "queued":
+            assert time.time() < deadline
+            time.sleep(0.01)
+        assert submit(client, operations).status_code == 202
+
+        response = submit(client, operations)
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "2"
+
+        health = client.get("/health").json()
+        assert health["queue_depth"] == 1
+        assert health["queue_capacity"] == 1
+        assert health["running"] == 1
+        assert health["rejected"] == 1
+
+
+def test_health_reports_queue_state(start_client):
+    with start_client() as client:
+        health = client.get("/health").json()
+        assert health["status"] == "healthy"
+        assert health["backend"] == "stub"
+        assert health["ready"] is True
+        assert health["queue_depth"] == 0
+
+
+@pytest.mark.parametrize("operations", [
+    [],
+    [{"type": "unknown", "intensity": 0.5}],
+    [{"type": "face_slim"}],
+    [{"type": "face_slim", "intensity": 1.5}],
+    [{"type": "face_slim", "intensity": "0.5"}],
+    [{"type": "beauty_filter", "filter_type": "vintage", "intensity": 0.5}],
+    [{"type": "body_slim", "intensity": 0.5, "seed": "42"}],
+])
+def test_invalid_operations_return_400(start_client, operations):
+    with start_client() as client:
+        assert submit(client, operations).status_code == 400
+
+
+def test_invalid_quality_returns_400(start_client):
+    with start_client() as client:
+        response = submit(client, [{"type": "face_slim", "intensity": 0.5}], quality="ultra")
+        assert response.status_code == 400
+
+
+def test_trimmed_jobs_delete_result_files(start_client, monkeypatch):
+    monkeypatch.setattr(api_server, "MAX_FINISHED_JOBS", 1)
+    with start_client() as client:
+        job_ids = []
+        for _ in range(2):
+            response = submit(client, [{"type": "face_slim", "intensity": 0.2}])
+            job_ids.append(response.json()["job_id"])
+            wait_for_job(client, job_ids[-1])
+
+        assert client.get(f"/api/jobs/{job_ids[0]}").status_code == 404
+        assert client.get(f"/api/jobs/{job_ids[1]}/result").status_code == 200
+        assert [p.stem for p in api_server.RESULT_DIR.glob("*.png")] == [job_ids[1]]
@@ -0,0 +1,54 @@
+"""
+扩散结果缓存测试
+"""
+import os
+
+from PIL import Image
+
+from output_cache import OutputCache, derive_seed
+
+
+def make_image(color) -> Image.Image:
+    return Image.new("RGB", (32, 32), color)
+
+
+def test_get_returns_cached_image(tmp_path):
+    cache = OutputCache(str(tmp_path))
+    key = OutputCache.make_key(pipeline="inpaint", prompt="slim face", seed=1)
+
+    assert cache.get(key) is None
+    cache.put(key, make_image((255, 0, 0)))
+    cached = cache.get(key)
+
+    assert cached.getpixel((0, 0)) == (255, 0, 0)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_make_key_is_order_independent():
+    assert OutputCache.make_key(a=1, b="x") == OutputCache.make_key(b="x", a=1)
+    assert OutputCache.make_key(a=1) != OutputCache.make_key(a=2)
+    assert derive_seed(a=1, b="x") == derive_seed(b="x", a=1)
+
+
+def test_evicts_least_recently_used(tmp_path):
+    keys = [OutputCache.make_key(index=i) for i in range(3)]
+    cache = OutputCache(str(tmp_path))
+    cache.put(keys[0], make_image((0, 0, 0)))
+    entry_size = cache.stats()["bytes"]
+    # 容量只够放两条（淘汰到上限的 90%，即只需删除一条）
+    cache.max_bytes = int(entry_size * 2.5)
+
+    cache.put(keys[1], make_image((1, 1, 1)))
+    # 设置明确的访问时间，避免依赖文件系统时间精度
+    os.utime(cache._path(keys[0]), (1000, 1000))
+    os.utime(cache._path(keys[1]), (2000, 2000))
+    # 访问第一条后，第二条变成最久未使用
+    assert cache.get(keys[0]) is not None
+
+    cache.put(keys[2], make_image((2, 2, 2)))
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+    assert cache.stats()["bytes"] <= cache.max_bytes
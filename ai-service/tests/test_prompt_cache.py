@@ -0,0 +1,70 @@
+"""
+提示词 Embedding 缓存测试（使用假的 encode_prompt，不加载模型）
+"""
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from prompt_cache import EMBEDDING_KEYS, PromptEmbeddingCache
+
+
+class FakePipeline:
+    _execution_device = "cpu"
+
+    def __init__(self):
+        self.calls = []
+
+    def encode_prompt(self, prompt, device, num_images_per_prompt, do_classifier_free_guidance,
+                      negative_prompt):
+        self.calls.append((prompt, negative_prompt))
+        value = float(len(self.calls))
+        return tuple(torch.full((1, 2), value) for _ in EMBEDDING_KEYS)
+
+
+def test_precomputed_prompts_are_not_reencoded():
+    pipeline = FakePipeline()
+    cache = PromptEmbeddingCache(max_custom_entries=1)
+    cache.precompute("inpaint", pipeline, [("slim face", "blurry"), ("round face", "blurry")])
+    assert len(pipeline.calls) == 2
+
+    embeds = cache.get("inpaint", pipeline, "slim face", "blurry")
+
+    assert set(embeds) == set(EMBEDDING_KEYS)
+    assert len(pipeline.calls) == 2
+    # 管道名是 key 的一部分
+    cache.get("img2img", pipeline, "slim face", "blurry")
+    assert len(pipeline.calls) == 3
+
+
+def test_custom_prompts_use_lru_eviction():
+    pipeline = FakePipeline()
+    cache = PromptEmbeddingCache(max_custom_entries=2)
+    cache.precompute("inpaint", pipeline, [("builtin", "")])
+
+    cache.get("inpaint", pipeline, "a", "")
+    cache.get("inpaint", pipeline, "b", "")
+    # 访问 a 后，b 成为最久未使用
+    cache.get("inpaint", pipeline, "a", "")
+    cache.get("inpaint", pipeline, "c", "")
+    assert len(pipeline.calls) == 4
+    assert len(cache) == 3
+
+    cache.get("inpaint", pipeline, "a", "")
+    assert len(pipeline.calls) == 4
+    cache.get("inpaint", pipeline, "b", "")
+    assert len(pipeline.calls) == 5
+    # 内置提示词不会被淘汰
+    cache.get("inpaint", pipeline, "builtin", "")
+    assert len(pipeline.calls) == 5
+
+
+def test_clear_by_pipeline_name():
+    pipeline = FakePipeline()
+    cache = PromptEmbeddingCache()
+    cache.precompute("inpaint", pipeline, [("x", "")])
+    cache.get("openpose", pipeline, "y", "")
+
+    cache.clear("inpaint")
+    assert len(cache) == 1
+    cache.clear()
+    assert len(cache) == 0
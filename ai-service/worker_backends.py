@@ -0,0 +1,190 @@
+"""
+AI Worker 模型后端
+
+DiffusionBackend 使用 ImageProcessor + StableDiffusionService 进行真实推理；
+StubBackend 只做简单的 PIL 处理，不依赖 GPU / torch，用于测试和本地联调。
+"""
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+from PIL import Image, ImageEnhance, ImageFilter
+
+# 进度回调: (操作序号, 当前步数, 总步数, 预览图或 None)
+JobProgressCallback = Callable[[int, int, int, Optional[Image.Image]], None]
+
+# 可预加载的管道名称
+PIPELINE_NAMES = ("inpaint", "openpose", "base")
+
+
+class DiffusionBackend:
+    name = "diffusion"
+
+    def __init__(
+        self,
+        preload_pipelines: Optional[List[str]] = None,
+        output_cache_dir: Optional[str] = "./cache/outputs",
+        output_cache_max_bytes: int = 2 * 1024 ** 3
+    ):
+        self.preload_pipelines = list(preload_pipelines or PIPELINE_NAMES)
+        unknown = set(self.preload_pipelines) - set(PIPELINE_NAMES)
+        if unknown:
+            raise ValueError(
+                f"未知的管道: {', '.join(sorted(unknown))}，可选: {', '.join(PIPELINE_NAMES)}"
+            )
+        self.output_cache_dir = output_cache_dir
+        self.output_cache_max_bytes = output_cache_max_bytes
+        self.processor = None
+        self.sd_service = None
+
+    def load(self):
+        """加载预处理模型和配置的扩散管道"""
+        # 延迟导入，避免 stub 模式依赖 torch / diffusers
+        from image_processor import ImageProcessor
+        from sd_service import StableDiffusionService
+
+        self.processor = ImageProcessor()
+        self.sd_service = StableDiffusionService(
+            output_cache_dir=self.output_cache_dir,
+            output_cache_max_bytes=self.output_cache_max_bytes
+        )
+
+        loaders = {
+            "inpaint": self.sd_service.load_inpaint_model,
+            "openpose": self.sd_service.load_controlnet_models,
+            "base": self.sd_service.load_base_model,
+        }
+        for name in self.preload_pipelines:
+            loaders[name]()
+
+    def warmup(self):
+        """用小图跑一遍各管道，完成 CUDA kernel 选择和显存分配"""
+        image = Image.new("RGB", (256, 256), (128, 128, 128))
+        mask = Image.new("L", (256, 256), 255)
+
+        # 预热必须真正推理，暂时关闭结果缓存
+        output_cache, self.sd_service.output_cache = self.sd_service.output_cache, None
+        try:
+            if "inpaint" in self.preload_pipelines:
+                self.sd_service.face_slimming(image, mask, quality="preview")
+            if "openpose" in self.preload_pipelines:
+                self.sd_service.body_slimming(image, image, quality="preview")
+            if "base" in self.preload_pipelines:
+                self.sd_service.apply_beauty_filter(image, quality="preview")
+        finally:
+            self.sd_service.output_cache = output_cache
+
+    def process(
+        self,
+        image: Image.Image,
+        operations: List[Dict],
+        quality: str,
+        progress_callback: Optional[JobProgressCallback] = None
+    ) -> Image.Image:
+        """依次执行操作列表"""
+        for index, operation in enumerate(operations):
+            def on_step(step, total_steps, preview, index=index):
+                if progress_callback:
+                    progress_callback(index, step, total_steps, preview)
+
+            if operation["type"] == "face_slim":
+                mask = self.processor.detect_face_region(image)
+                if mask is None:
+                    print("未检测到人脸，跳过瘦脸处理")
+                    continue
+                image = self.sd_service.face_slimming(
+                    image,
+                    mask,
+                    operation["intensity"],
+                    quality=quality,
+                    seed=operation.get("seed"),
+                    progress_callback=on_step
+                )
+
+            elif operation["type"] == "body_slim":
+                pose_image = self.processor.detect_body_pose(image)
+                image = self.sd_service.body_slimming(
+                    image,
+                    pose_image,
+                    operation["intensity"],
+                    quality=quality,
+                    seed=operation.get("seed"),
+                    progress_callback=on_step
+                )
+
+            elif operation["type"] == "beauty_filter":
+                image = self.sd_service.apply_beauty_filter(
+                    image,
+                    operation.get("filter_type", "natural"),
+                    operation["intensity"],
+                    quality=quality,
+                    seed=operation.get("seed"),
+                    progress_callback=on_step
+                )
+
+        return image
+
+
+class StubBackend:
+    name = "stub"
+
+    def __init__(self, steps: int = 4, step_delay: float = 0.0):
+        self.steps = steps
+        self.step_delay = step_delay
+
+    def load(self):
+        pass
+
+    def warmup(self):
+        pass
+
+    def process(
+        self,
+        image: Image.Image,
+        operations: List[Dict],
+        quality: str,
+        progress_callback: Optional[JobProgressCallback] = None
+    ) -> Image.Image:
+        """模拟分步处理，每步上报进度和当前图像的预览"""
+        for index, operation in enumerate(operations):
+            for step in range(1, self.steps + 1):
+                if self.step_delay:
+                    time.sleep(self.step_delay)
+                if progress_callback:
+                    progress_callback(index, step, self.steps, image if step < self.steps else None)
+
+            if operation["type"] == "face_slim":
+                width, height = image.size
+                new_width = int(width * (1 - operation["intensity"] * 0.05))
+                image = image.resize((new_width, height), Image.Resampling.LANCZOS)
+
+            elif operation["type"] == "body_slim":
+                width, height = image.size
+                new_width = int(width * (1 - operation["intensity"] * 0.08))
+                image = image.resize((new_width, height), Image.Resampling.LANCZOS)
+
+            elif operation["type"] == "beauty_filter":
+                image = image.filter(ImageFilter.SMOOTH_MORE)
+                image = ImageEnhance.Brightness(image).enhance(1 + operation["intensity"] * 0.2)
+
+        return image
+
+
+def create_backend(name: Optional[str] = None):
+    """根据名称（默认读取 AI_BACKEND 环境变量）创建模型后端"""
+    name = name or os.getenv("AI_BACKEND", "diffusion")
+
+    if name == "diffusion":
+        preload = os.getenv("AI_PRELOAD_MODELS")
+        return DiffusionBackend(
+            [p.strip() for p in preload.split(",") if p.strip()] if preload else None,
+            output_cache_dir=os.getenv("AI_OUTPUT_CACHE_DIR", "./cache/outputs") or None,
+            output_cache_max_bytes=int(os.getenv("AI_OUTPUT_CACHE_MAX_MB", "2048")) * 1024 ** 2
+        )
+    elif name == "stub":
+        return StubBackend(
+            steps=int(os.getenv("AI_STUB_STEPS", "4")),
+            step_delay=float(os.getenv("AI_STUB_STEP_DELAY", "0"))
+        )
+
+    raise ValueError(f"未知的模型后端: {name}，可选: diffusion, stub")
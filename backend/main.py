@@ -7,7 +7,7 @@ from typing import Optional, Dict, Any
 import os
 from datetime import datetime
 import uuid
-from tasks import celery_app, process_image, task_progress
+from tasks import celery_app, process_image, task_progress, QUALITY_TIERS, DEFAULT_QUALITY
 import shutil
 from pathlib import Path
 
@@ -22,17 +22,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 上传 / 结果目录（与 Celery 任务共用同名环境变量）
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "uploads"))
+RESULT_DIR = Path(os.getenv("RESULT_DIR", "results"))
+
 # 确保必要的目录存在
-Path("uploads").mkdir(exist_ok=True)
-Path("results").mkdir(exist_ok=True)
+UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+RESULT_DIR.mkdir(parents=True, exist_ok=True)
 
 # 静态文件服务（用于测试）
-app.mount("/static/uploads", StaticFiles(directory="uploads"), name="uploads")
-app.mount("/static/results", StaticFiles(directory="results"), name="results")
+app.mount("/static/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
+app.mount("/static/results", StaticFiles(directory=RESULT_DIR), name="results")
 
 # 存储任务信息
 active_tasks: Dict[str, Any] = {}
 
+def validate_quality(quality: str):
+    """校验质量档位"""
+    if quality not in QUALITY_TIERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"质量档位必须是: {', '.join(QUALITY_TIERS)}"
+        )
+
 @app.get("/")
 async def root():
     return {"message": "臭小优P图 API 服务运行中"}
@@ -52,7 +64,7 @@ async def upload_image(file: UploadFile = File(...)):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     file_ext = file.filename.split('.')[-1]
     filename = f"{timestamp}_{uuid.uuid4().hex[:8]}.{file_ext}"
-    filepath = Path("uploads") / filename
+    filepath = UPLOAD_DIR / filename
     
     # 保存文件
     with open(filepath, "wb") as f:
@@ -68,18 +80,22 @@ async def upload_image(file: UploadFile = File(...)):
 @app.post("/api/process/face-slim")
 async def process_face_slim(
     filename: str,
-    intensity: float = 0.5
+    intensity: float = 0.5,
+    quality: str = DEFAULT_QUALITY
 ):
     """瘦脸处理"""
+    validate_quality(quality)
+    
     # 创建 Celery 任务
     task = process_image.delay(filename, [{
         "type": "face_slim",
         "intensity": intensity
-    }])
+    }], quality)
     
     active_tasks[task.id] = {
         "type": "face_slim",
         "filename": filename,
+        "quality": quality,
         "start_time": datetime.now()
     }
     
@@ -92,17 +108,21 @@ async def process_face_slim(
 @app.post("/api/process/body-slim")
 async def process_body_slim(
     filename: str,
-    intensity: float = 0.5
+    intensity: float = 0.5,
+    quality: str = DEFAULT_QUALITY
 ):
     """瘦身处理"""
+    validate_quality(quality)
+    
     task = process_image.delay(filename, [{
         "type": "body_slim",
         "intensity": intensity
-    }])
+    }], quality)
     
     active_tasks[task.id] = {
         "type": "body_slim",
         "filename": filename,
+        "quality": quality,
         "start_time": datetime.now()
     }
     
@@ -116,19 +136,23 @@ async def process_body_slim(
 async def process_beauty_filter(
     filename: str,
     filter_type: str = "natural",
-    intensity: float = 0.5
+    intensity: float = 0.5,
+    quality: str = DEFAULT_QUALITY
 ):
     """美颜滤镜"""
+    validate_quality(quality)
+    
     task = process_image.delay(filename, [{
         "type": "beauty_filter",
         "filter_type": filter_type,
         "intensity": intensity
-    }])
+    }], quality)
     
     active_tasks[task.id] = {
         "type": "beauty_filter",
         "filename": filename,
         "filter_type": filter_type,
+        "quality": quality,
         "start_time": datetime.now()
     }
     
@@ -143,9 +167,12 @@ async def process_all(
     filename: str,
     face_slim: Optional[Dict[str, Any]] = None,
     body_slim: Optional[Dict[str, Any]] = None,
-    beauty_filter: Optional[Dict[str, Any]] = None
+    beauty_filter: Optional[Dict[str, Any]] = None,
+    quality: str = DEFAULT_QUALITY
 ):
     """批量处理：可以同时应用多个效果"""
+    validate_quality(quality)
+    
     operations = []
     
     if face_slim and face_slim.get("enabled"):
@@ -170,12 +197,13 @@ async def process_all(
     if not operations:
         raise HTTPException(status_code=400, detail="至少需要启用一个处理选项")
     
-    task = process_image.delay(filename, operations)
+    task = process_image.delay(filename, operations, quality)
     
     active_tasks[task.id] = {
         "type": "all",
         "filename": filename,
         "operations": operations,
+        "quality": quality,
         "start_time": datetime.now()
     }
     
@@ -190,8 +218,10 @@ async def get_task_status(task_id: str):
     """获取任务状态"""
     task = celery_app.AsyncResult(task_id)
     
-    # 从任务进度存储中获取详细进度
+    # 优先使用 Celery 状态中的进度信息（跨进程可见），其次是本地进度存储
     progress_info = task_progress.get(task_id, {})
+    if task.state == 'PROGRESS' and isinstance(task.info, dict):
+        progress_info = task.info
     
     if task.state == 'PENDING':
         return {
@@ -205,7 +235,10 @@ async def get_task_status(task_id: str):
             "task_id": task_id,
             "status": "processing",
             "progress": progress_info.get("progress", 0),
-            "message": progress_info.get("status", "处理中")
+            "message": progress_info.get("status", "处理中"),
+            "step": progress_info.get("step"),
+            "total_steps": progress_info.get("total_steps"),
+            "preview": progress_info.get("preview")
         }
     elif task.state == 'SUCCESS':
         result = task.result
@@ -228,7 +261,7 @@ async def get_task_status(task_id: str):
 async def get_result(task_id: str):
     """获取处理结果"""
     # 检查结果文件是否存在
-    result_path = Path("results") / f"result_{task_id}.jpg"
+    result_path = RESULT_DIR / f"result_{task_id}.jpg"
     
     if not result_path.exists():
         # 尝试从任务结果中获取文件名
@@ -236,7 +269,7 @@ async def get_result(task_id: str):
         if task.state == 'SUCCESS' and task.result:
             filename = task.result.get("result_filename")
             if filename:
-                result_path = Path("results") / filename
+                result_path = RESULT_DIR / filename
     
     if result_path.exists():
         return FileResponse(
@@ -7,84 +7,142 @@ from celery import Celery
 from PIL import Image, ImageEnhance, ImageFilter
 import io
 import os
+import base64
+import json
+from typing import Optional
+import httpx
+
+# CELERY_EAGER=1 时在进程内同步执行任务，结果存于内存（本地基准测试 / 无 Redis 调试）
+CELERY_EAGER = os.getenv('CELERY_EAGER', '0') == '1'
 
 # 创建 Celery 实例
-celery_app = Celery(
-    'tasks',
-    broker=os.getenv('REDIS_URL', 'redis://localhost:6379'),
-    backend=os.getenv('REDIS_URL', 'redis://localhost:6379')
-)
+if CELERY_EAGER:
+    celery_app = Celery('tasks', broker='memory://', backend='cache+memory://')
+    celery_app.conf.task_always_eager = True
+    celery_app.conf.task_store_eager_result = True
+else:
+    celery_app = Celery(
+        'tasks',
+        broker=os.getenv('REDIS_URL', 'redis://localhost:6379'),
+        backend=os.getenv('REDIS_URL', 'redis://localhost:6379')
+    )
+
+# 上传 / 结果目录（默认值与 main.py 一致）
+UPLOAD_DIR = os.getenv('UPLOAD_DIR', 'uploads')
+RESULT_DIR = os.getenv('RESULT_DIR', 'results')
+
+# 模拟处理的耗时（秒）
+SIMULATE_DELAY = float(os.getenv('SIMULATE_DELAY', '1'))
 
 # 任务状态存储
 task_progress = {}
 
+# AI Worker 服务地址；未配置时使用本地模拟处理
+AI_SERVICE_URL = os.getenv('AI_SERVICE_URL')
+AI_SERVICE_TIMEOUT = float(os.getenv('AI_SERVICE_TIMEOUT', '600'))
+AI_SERVICE_POLL_INTERVAL = float(os.getenv('AI_SERVICE_POLL_INTERVAL', '0.5'))
+
+# 质量档位：preview 用于交互式预览（降低分辨率和 JPEG 质量），
+# standard / final 保持原图分辨率；扩散参数由 AI 服务按同名档位选择
+DEFAULT_QUALITY = "standard"
+QUALITY_TIERS = {
+    "preview": {"max_size": 768, "jpeg_quality": 80},
+    "standard": {"max_size": None, "jpeg_quality": 95},
+    "final": {"max_size": None, "jpeg_quality": 98},
+}
+
+# 操作阶段在总进度中占据的区间
+OPERATIONS_PROGRESS_START = 25
+OPERATIONS_PROGRESS_END = 90
+PREVIEW_MAX_SIZE = 256
+
+def operation_progress(index: int, count: int, fraction: float = 0.0) -> int:
+    """
+    计算第 index 个操作完成 fraction 时的总进度
+    
+    Args:
+        index: 当前操作序号（从 0 开始）
+        count: 操作总数
+        fraction: 当前操作的完成比例 (0-1)，如去噪步数 / 总步数
+    """
+    span = OPERATIONS_PROGRESS_END - OPERATIONS_PROGRESS_START
+    done = (index + min(max(fraction, 0.0), 1.0)) / max(count, 1)
+    return int(OPERATIONS_PROGRESS_START + span * done)
+
+def image_to_preview_data_url(image: Image.Image, max_size: int = PREVIEW_MAX_SIZE) -> str:
+    """生成低分辨率预览图的 JPEG data URL"""
+    preview = image.convert("RGB")
+    preview.thumbnail((max_size, max_size), Image.Resampling.BILINEAR)
+    buffer = io.BytesIO()
+    preview.save(buffer, "JPEG", quality=70)
+    return "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
 @celery_app.task(bind=True)
-def process_image(self, filename: str, operations: list):
+def process_image(self, filename: str, operations: list, quality: str = DEFAULT_QUALITY):
     """
     处理图片的 Celery 任务
     
     Args:
         filename: 图片文件名
         operations: 操作列表 [{type: 'face_slim', intensity: 0.5}, ...]
+        quality: 质量档位 (preview / standard / final)
     """
     task_id = self.request.id
     
-    # 更新进度
-    def update_progress(progress: int, status: str = "processing"):
-        task_progress[task_id] = {
-            "progress": progress,
-            "status": status
-        }
-        self.update_state(
-            state='PROGRESS',
-            meta={'progress': progress, 'status': status}
-        )
+    # 更新进度（可附带去噪步数和中间预览图）
+    def update_progress(
+        progress: int,
+        status: str = "processing",
+        step: Optional[int] = None,
+        total_steps: Optional[int] = None,
+        preview: Optional[str] = None
+    ):
+        meta = {'progress': progress, 'status': status}
+        if step is not None:
+            meta['step'] = step
+            meta['total_steps'] = total_steps
+        # 没有新预览时沿用上一张
+        previous = task_progress.get(task_id, {})
+        if preview is None and progress > 0:
+            preview = previous.get('preview')
+        if preview is not None:
+            meta['preview'] = preview
+        
+        task_progress[task_id] = meta
+        self.update_state(state='PROGRESS', meta=meta)
     
     try:
+        if quality not in QUALITY_TIERS:
+            raise ValueError(f"未知的质量档位: {quality}")
+        tier = QUALITY_TIERS[quality]
+        
         # 加载图片
         update_progress(10, "正在加载图片")
-        image_path = f"../uploads/{filename}"
+        image_path = os.path.join(UPLOAD_DIR, filename)
         image = Image.open(image_path)
         
-        # 模拟处理过程
-        update_progress(25, "正在分析图片")
-        time.sleep(1)  # 模拟分析时间
+        # 预览档位先缩小图片
+        if tier["max_size"] and max(image.size) > tier["max_size"]:
+            image = image.copy()
+            image.thumbnail((tier["max_size"], tier["max_size"]), Image.Resampling.LANCZOS)
         
-        # 应用各种效果
-        for i, operation in enumerate(operations):
-            progress = 25 + (50 / len(operations)) * (i + 1)
-            
-            if operation['type'] == 'face_slim':
-                update_progress(int(progress), "正在进行瘦脸处理")
-                # 模拟瘦脸效果（实际应调用 AI 模型）
-                image = simulate_face_slim(image, operation['intensity'])
-                
-            elif operation['type'] == 'body_slim':
-                update_progress(int(progress), "正在进行瘦身处理")
-                # 模拟瘦身效果
-                image = simulate_body_slim(image, operation['intensity'])
-                
-            elif operation['type'] == 'beauty_filter':
-                update_progress(int(progress), "正在应用美颜滤镜")
-                # 模拟美颜效果
-                image = simulate_beauty_filter(
-                    image, 
-                    operation['filter_type'], 
-                    operation['intensity']
-                )
-            
-            time.sleep(1)  # 模拟处理时间
+        if AI_SERVICE_URL:
+            update_progress(OPERATIONS_PROGRESS_START, "正在排队等待 AI 服务")
+            image = process_with_ai_service(image, operations, quality, update_progress)
+        else:
+            image = process_with_simulation(image, operations, update_progress)
         
         # 保存结果
-        update_progress(90, "正在保存结果")
+        update_progress(OPERATIONS_PROGRESS_END, "正在保存结果")
         result_filename = f"result_{task_id}.jpg"
-        result_path = f"../results/{result_filename}"
-        image.save(result_path, "JPEG", quality=95)
+        result_path = os.path.join(RESULT_DIR, result_filename)
+        image.save(result_path, "JPEG", quality=tier["jpeg_quality"])
         
         update_progress(100, "completed")
         
         return {
             "status": "completed",
+            "quality": quality,
             "result_filename": result_filename,
             "result_url": f"/api/result/{task_id}"
         }
@@ -96,6 +154,122 @@ def process_image(self, filename: str, operations: list):
             "error": str(e)
         }
 
+OPERATION_STATUS = {
+    "face_slim": "正在进行瘦脸处理",
+    "body_slim": "正在进行瘦身处理",
+    "beauty_filter": "正在应用美颜滤镜",
+}
+
+def check_ai_response(response: httpx.Response):
+    """AI 服务返回错误时抛出异常，并带上服务给出的 detail（如参数校验原因）"""
+    if response.is_success:
+        return
+    try:
+        body = response.json()
+        detail = body.get("detail") if isinstance(body, dict) else None
+    except ValueError:
+        detail = None
+    raise RuntimeError(f"AI 服务错误 ({response.status_code}): {detail or response.text}")
+
+def process_with_ai_service(
+    image: Image.Image,
+    operations: list,
+    quality: str,
+    update_progress
+) -> Image.Image:
+    """
+    提交到 AI Worker 服务处理，并把真实步数进度和中间预览转发到任务进度
+    
+    AI 服务暂时无法接收任务（503 + Retry-After）时退避重试，其他错误直接失败。
+    """
+    buffer = io.BytesIO()
+    image.convert("RGB").save(buffer, "PNG")
+    deadline = time.time() + AI_SERVICE_TIMEOUT
+    
+    with httpx.Client(base_url=AI_SERVICE_URL, timeout=30) as client:
+        # 提交任务
+        while True:
+            response = client.post(
+                "/api/jobs",
+                files={"file": ("image.png", buffer.getvalue(), "image/png")},
+                data={"operations": json.dumps(operations), "quality": quality}
+            )
+            retry_after = response.headers.get("Retry-After")
+            if response.status_code != 503 or retry_after is None:
+                check_ai_response(response)
+                break
+            if time.time() > deadline:
+                raise TimeoutError("AI 服务繁忙，排队超时")
+            time.sleep(float(retry_after))
+        job_id = response.json()["job_id"]
+        
+        # 轮询进度
+        while True:
+            response = client.get(f"/api/jobs/{job_id}")
+            if response.status_code == 404:
+                # AI 服务重启或已清理该任务
+                raise RuntimeError("AI 服务任务丢失，请重新提交")
+            check_ai_response(response)
+            job = response.json()
+            if job["status"] == "completed":
+                break
+            if job["status"] == "failed":
+                raise RuntimeError(f"AI 处理失败: {job.get('error')}")
+            if time.time() > deadline:
+                raise TimeoutError("AI 处理超时")
+            
+            if job["status"] == "processing" and job.get("total_steps"):
+                index = job["operation_index"]
+                update_progress(
+                    operation_progress(index, len(operations), job["step"] / job["total_steps"]),
+                    OPERATION_STATUS[operations[index]["type"]],
+                    step=job["step"],
+                    total_steps=job["total_steps"],
+                    preview=job.get("preview")
+                )
+            time.sleep(AI_SERVICE_POLL_INTERVAL)
+        
+        response = client.get(f"/api/jobs/{job_id}/result")
+        check_ai_response(response)
+        return Image.open(io.BytesIO(response.content))
+
+def process_with_simulation(image: Image.Image, operations: list, update_progress) -> Image.Image:
+    """本地模拟处理（未配置 AI 服务时使用）"""
+    update_progress(25, "正在分析图片")
+    time.sleep(SIMULATE_DELAY)  # 模拟分析时间
+    
+    # 应用各种效果
+    for i, operation in enumerate(operations):
+        progress = operation_progress(i, len(operations))
+        update_progress(progress, OPERATION_STATUS[operation['type']])
+        
+        if operation['type'] == 'face_slim':
+            # 模拟瘦脸效果
+            image = simulate_face_slim(image, operation['intensity'])
+            
+        elif operation['type'] == 'body_slim':
+            # 模拟瘦身效果
+            image = simulate_body_slim(image, operation['intensity'])
+            
+        elif operation['type'] == 'beauty_filter':
+            # 模拟美颜效果
+            image = simulate_beauty_filter(
+                image, 
+                operation['filter_type'], 
+                operation['intensity']
+            )
+        
+        time.sleep(SIMULATE_DELAY)  # 模拟处理时间
+        
+        # 每个操作完成后推送一张中间结果预览
+        update_progress(
+            operation_progress(i + 1, len(operations)),
+            "正在处理",
+            preview=image_to_preview_data_url(image)
+        )
+    
+    return image
+
 def simulate_face_slim(image: Image.Image, intensity: float) -> Image.Image:
     """模拟瘦脸效果（临时实现）"""
     # 这里只是简单地稍微压缩图片宽度来模拟瘦脸
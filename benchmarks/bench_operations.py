@@ -0,0 +1,160 @@
+"""
+单项操作微基准测试
+
+测试后端各 simulate_* 操作和 ImageProcessor 各方法在不同图片尺寸下的耗时。
+ImageProcessor 依赖 mediapipe / dlib / controlnet_aux，未安装时该组会标记为 skipped。
+
+用法:
+    python benchmarks/bench_operations.py [--sizes 512 1024 2048] [--repeat 5]
+        [--image photo.jpg] [--group simulate processor] [--output ops.json] [--baseline old.json]
+"""
+import argparse
+import os
+import time
+from typing import Callable, Dict, Any
+
+import numpy as np
+from PIL import Image
+
+from common import (
+    AI_SERVICE_DIR,
+    BACKEND_DIR,
+    add_import_path,
+    compare_to_baseline,
+    summarize_latencies,
+    write_results,
+)
+
+# 只导入任务函数，不需要 Redis
+os.environ.setdefault("CELERY_EAGER", "1")
+
+
+def make_test_image(size: int, source: Image.Image = None) -> Image.Image:
+    """生成指定长边尺寸的测试图片（提供源图时缩放源图）"""
+    if source is not None:
+        image = source.convert("RGB")
+        scale = size / max(image.size)
+        return image.resize(
+            (max(1, int(image.width * scale)), max(1, int(image.height * scale))),
+            Image.Resampling.LANCZOS
+        )
+
+    # 渐变 + 噪声，避免纯色图让滤镜走捷径
+    rng = np.random.default_rng(size)
+    height = size * 3 // 4
+    gradient = np.linspace(0, 255, size, dtype=np.float32)[None, :, None]
+    noise = rng.normal(0, 20, (height, size, 3)).astype(np.float32)
+    array = np.clip(gradient + noise, 0, 255).astype(np.uint8)
+    return Image.fromarray(array)
+
+
+def time_call(func: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    """多次调用并统计延迟和吞吐量"""
+    for _ in range(warmup):
+        func()
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    stats = summarize_latencies(latencies)
+    stats["throughput"] = repeat / sum(latencies) if sum(latencies) > 0 else 0.0
+    return stats
+
+
+def bench_simulate(images: Dict[int, Image.Image], repeat: int) -> Dict[str, Any]:
+    add_import_path(BACKEND_DIR)
+    from tasks import simulate_face_slim, simulate_body_slim, simulate_beauty_filter
+
+    operations = {
+        "simulate_face_slim": lambda image: simulate_face_slim(image, 0.5),
+        "simulate_body_slim": lambda image: simulate_body_slim(image, 0.5),
+    }
+    for filter_type in ("natural", "glamour", "fresh", "artistic"):
+        operations[f"simulate_beauty_filter[{filter_type}]"] = (
+            lambda image, filter_type=filter_type: simulate_beauty_filter(image, filter_type, 0.5)
+        )
+
+    results = {}
+    for name, func in operations.items():
+        results[name] = {
+            str(size): time_call(lambda: func(image), repeat)
+            for size, image in images.items()
+        }
+    return results
+
+
+def bench_processor(images: Dict[int, Image.Image], repeat: int, batch_size: int) -> Dict[str, Any]:
+    add_import_path(AI_SERVICE_DIR)
+    from image_processor import ImageProcessor
+
+    processor = ImageProcessor()
+    try:
+        operations = {
+            "detect_face_region": processor.detect_face_region,
+            "detect_body_pose": processor.detect_body_pose,
+            "create_body_mask": processor.create_body_mask,
+            "enhance_image_quality": processor.enhance_image_quality,
+            "resize_for_processing": processor.resize_for_processing,
+        }
+        results = {}
+        for name, func in operations.items():
+            results[name] = {
+                str(size): time_call(lambda: func(image), repeat)
+                for size, image in images.items()
+            }
+
+        # 批量接口：记录每批吞吐量
+        batch_operations = {
+            "detect_face_regions": processor.detect_face_regions,
+            "create_body_masks": processor.create_body_masks,
+            "enhance_images": processor.enhance_images,
+        }
+        for name, func in batch_operations.items():
+            results[name] = {}
+            for size, image in images.items():
+                batch = [image] * batch_size
+                stats = time_call(lambda: func(batch), repeat)
+                stats["images_per_second"] = stats["throughput"] * batch_size
+                stats["batch_size"] = batch_size
+                stats["workers"] = processor.max_workers
+                results[name][str(size)] = stats
+        return results
+    finally:
+        processor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="单项操作微基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[512, 1024, 2048], help="图片长边尺寸")
+    parser.add_argument("--repeat", type=int, default=5, help="每项重复次数")
+    parser.add_argument("--batch-size", type=int, default=16, help="批量接口每批图片数")
+    parser.add_argument("--image", help="用真实图片代替合成图片")
+    parser.add_argument("--group", nargs="+", choices=["simulate", "processor"],
+                        default=["simulate", "processor"])
+    parser.add_argument("--output", help="JSON 结果输出路径")
+    parser.add_argument("--baseline", help="用于对比的基线 JSON")
+    args = parser.parse_args()
+
+    source = Image.open(args.image) if args.image else None
+    images = {size: make_test_image(size, source) for size in args.sizes}
+
+    results: Dict[str, Any] = {
+        "config": {"sizes": args.sizes, "repeat": args.repeat, "batch_size": args.batch_size,
+                   "image": args.image or "synthetic"},
+    }
+    if "simulate" in args.group:
+        results["simulate"] = bench_simulate(images, args.repeat)
+    if "processor" in args.group:
+        try:
+            results["processor"] = bench_processor(images, args.repeat, args.batch_size)
+        except ImportError as e:
+            results["processor"] = {"skipped": f"缺少依赖: {e}"}
+
+    report = write_results("operations", results, args.output)
+    if args.baseline:
+        compare_to_baseline(report, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+质量档位基准测试
+
+对每个质量档位运行瘦脸 / 瘦身 / 美颜，报告延迟以及与 final 档位输出的差异。
+需要 GPU 和已下载的模型。
+
+用法:
+    python benchmarks/bench_quality_tiers.py --image path/to/photo.jpg [--output tiers.json]
+"""
+import argparse
+import time
+
+import numpy as np
+import torch
+from PIL import Image
+
+from common import AI_SERVICE_DIR, add_import_path, summarize_latencies, write_results
+
+add_import_path(AI_SERVICE_DIR)
+
+from image_processor import ImageProcessor  # noqa: E402
+from quality_tiers import QUALITY_TIERS  # noqa: E402
+from sd_service import StableDiffusionService  # noqa: E402
+
+REFERENCE_TIER = "final"
+
+
+def image_difference(image: Image.Image, reference: Image.Image) -> dict:
+    """计算两张图片的平均绝对误差和 PSNR"""
+    a = np.asarray(image.convert("RGB"), dtype=np.float32)
+    b = np.asarray(reference.convert("RGB").resize(image.size), dtype=np.float32)
+    mse = float(np.mean((a - b) ** 2))
+    return {
+        "mean_abs_diff": float(np.mean(np.abs(a - b))),
+        "psnr": float("inf") if mse == 0 else float(10 * np.log10(255.0 ** 2 / mse)),
+    }
+
+
+def run_operation(service, operation, image, inputs, quality, seed):
+    if operation == "face_slim":
+        return service.face_slimming(image, inputs["face_mask"], quality=quality, seed=seed)
+    elif operation == "body_slim":
+        return service.body_slimming(image, inputs["pose_image"], quality=quality, seed=seed)
+    else:
+        return service.apply_beauty_filter(image, "natural", quality=quality, seed=seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="质量档位基准测试")
+    parser.add_argument("--image", required=True, help="测试图片路径")
+    parser.add_argument("--repeat", type=int, default=3, help="每个档位重复次数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON 结果输出路径")
+    args = parser.parse_args()
+
+    image = Image.open(args.image).convert("RGB")
+    processor = ImageProcessor()
+    inputs = {
+        "face_mask": processor.detect_face_region(image),
+        "pose_image": processor.detect_body_pose(image),
+    }
+    # 关闭结果缓存，保证每次都真正推理
+    service = StableDiffusionService(output_cache_dir=None)
+
+    results = {}
+    for operation in ("face_slim", "body_slim", "beauty_filter"):
+        if operation == "face_slim" and inputs["face_mask"] is None:
+            # 没有人脸遮罩时 inpaint 无法运行，与 AI 服务的处理方式一致
+            print("未检测到人脸，跳过 face_slim（请换一张包含正脸的测试图片）")
+            results[operation] = {"skipped": "未检测到人脸"}
+            continue
+
+        # 预热：加载模型并预计算提示词 embedding
+        run_operation(service, operation, image, inputs, "preview", args.seed)
+
+        outputs = {}
+        results[operation] = {}
+        for quality in QUALITY_TIERS:
+            latencies = []
+            for _ in range(args.repeat):
+                if torch.cuda.is_available():
+                    torch.cuda.synchronize()
+                start = time.perf_counter()
+                outputs[quality] = run_operation(service, operation, image, inputs, quality, args.seed)
+                if torch.cuda.is_available():
+                    torch.cuda.synchronize()
+                latencies.append(time.perf_counter() - start)
+            results[operation][quality] = {
+                "settings": QUALITY_TIERS[quality][operation],
+                "latency": summarize_latencies(latencies),
+            }
+
+        for quality, output in outputs.items():
+            results[operation][quality]["difference_vs_" + REFERENCE_TIER] = image_difference(
+                output, outputs[REFERENCE_TIER]
+            )
+
+    write_results("quality_tiers", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
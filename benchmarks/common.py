@@ -0,0 +1,117 @@
+"""
+基准测试公共工具
+"""
+import json
+import math
+import platform
+import resource
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+AI_SERVICE_DIR = ROOT_DIR / "ai-service"
+BACKEND_DIR = ROOT_DIR / "backend"
+
+
+def add_import_path(path: Path):
+    """把服务目录加入 sys.path（各服务目录不是 Python 包）"""
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+def summarize_latencies(latencies: List[float]) -> Dict[str, float]:
+    """统计延迟（秒）的均值和 p50/p95/p99"""
+    if not latencies:
+        return {"count": 0}
+    ordered = sorted(latencies)
+
+    def percentile(p: float) -> float:
+        # nearest-rank：先乘后除，避免 0.99 * 100 之类的浮点误差多进一位
+        index = max(0, math.ceil(p * len(ordered) / 100) - 1)
+        return ordered[index]
+
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "min": ordered[0],
+        "max": ordered[-1],
+        "p50": percentile(50),
+        "p95": percentile(95),
+        "p99": percentile(99),
+    }
+
+
+def peak_rss_mb() -> float:
+    """当前进程的峰值常驻内存（MB）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    if sys.platform == "darwin":
+        return peak / 1024 / 1024
+    return peak / 1024
+
+
+def write_results(name: str, results: Dict[str, Any], output: str = None) -> Dict[str, Any]:
+    """输出 JSON 结果（写入文件或打印到标准输出）"""
+    report = {
+        "benchmark": name,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "peak_rss_mb": peak_rss_mb(),
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if output:
+        Path(output).write_text(text, encoding="utf-8")
+        print(f"结果已写入 {output}")
+    else:
+        print(text)
+    return report
+
+
+def _flatten(data: Any, prefix: str = "") -> Dict[str, float]:
+    """把嵌套结果展开为 {"a.b.p50": 值} 形式，只保留数值"""
+    flat = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            flat.update(_flatten(value, f"{prefix}.{key}" if prefix else str(key)))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        flat[prefix] = float(data)
+    return flat
+
+
+# 参与基线对比的指标（越小越好 / 越大越好）
+LOWER_IS_BETTER = ("p50", "p95", "p99", "mean", "peak_rss_mb")
+HIGHER_IS_BETTER = ("throughput", "images_per_second", "requests_per_second")
+
+
+def compare_to_baseline(report: Dict[str, Any], baseline_path: str) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    与基线结果对比，打印并返回各指标的变化百分比
+    
+    正的 change_pct 表示变好（延迟下降或吞吐上升）。
+    """
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    current = _flatten({"results": report["results"], "peak_rss_mb": report["peak_rss_mb"]})
+    previous = _flatten({"results": baseline["results"], "peak_rss_mb": baseline.get("peak_rss_mb")})
+
+    comparison = {}
+    for key, value in current.items():
+        metric = key.rsplit(".", 1)[-1]
+        if metric not in LOWER_IS_BETTER + HIGHER_IS_BETTER or key not in previous:
+            continue
+        old = previous[key]
+        change = None
+        if old:
+            change = (value - old) / old * 100
+            if metric in LOWER_IS_BETTER:
+                change = -change
+        comparison[key] = {"baseline": old, "current": value, "change_pct": change}
+
+    print(f"\n与基线对比 ({baseline_path}):", file=sys.stderr)
+    for key, item in comparison.items():
+        change = "n/a" if item["change_pct"] is None else f"{item['change_pct']:+.1f}%"
+        print(f"  {key}: {item['baseline']:.4g} -> {item['current']:.4g} ({change})", file=sys.stderr)
+    return comparison
@@ -0,0 +1,173 @@
+"""
+上传 → 处理 → 结果 全链路负载测试
+
+并发执行完整会话：POST /api/upload → POST /api/process/all →
+轮询 GET /api/task/{id} → GET /api/result/{id}，统计各接口和端到端的
+p50/p95/p99 延迟、吞吐量和峰值内存。
+
+默认在进程内运行后端（Celery eager + 内存 broker/backend，无需 Redis），
+注意 eager 模式下任务在 /api/process/all 请求内同步执行，该接口延迟包含处理时间，
+并发请求也会被串行化；测真实并发请使用 --base-url 指向已启动的服务。
+
+用法:
+    python benchmarks/load_test.py [--sessions 50] [--concurrency 8] [--image-size 1024]
+        [--quality standard] [--base-url http://localhost:8000] [--output load.json] [--baseline old.json]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import httpx
+
+from common import BACKEND_DIR, add_import_path, compare_to_baseline, summarize_latencies, write_results
+from bench_operations import make_test_image
+
+ENDPOINTS = ("upload", "process", "task", "result")
+
+
+def create_in_process_client(work_dir: str, simulate_delay: float) -> httpx.AsyncClient:
+    """在当前进程内加载后端应用（Celery eager 模式，上传 / 结果写入 work_dir）"""
+    os.environ["CELERY_EAGER"] = "1"
+    os.environ["UPLOAD_DIR"] = os.path.join(work_dir, "uploads")
+    os.environ["RESULT_DIR"] = os.path.join(work_dir, "results")
+    os.environ["SIMULATE_DELAY"] = str(simulate_delay)
+    os.environ.pop("AI_SERVICE_URL", None)
+
+    add_import_path(BACKEND_DIR)
+    from main import app
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+
+async def run_session(
+    client: httpx.AsyncClient,
+    image_bytes: bytes,
+    quality: str,
+    poll_interval: float,
+    latencies: Dict[str, List[float]]
+):
+    """执行一次完整会话，记录各阶段延迟"""
+    session_start = time.perf_counter()
+
+    async def timed(endpoint: str, request):
+        start = time.perf_counter()
+        response = await request
+        latencies[endpoint].append(time.perf_counter() - start)
+        response.raise_for_status()
+        return response
+
+    response = await timed("upload", client.post(
+        "/api/upload",
+        files={"file": ("bench.jpg", image_bytes, "image/jpeg")}
+    ))
+    filename = response.json()["filename"]
+
+    response = await timed("process", client.post(
+        "/api/process/all",
+        params={"filename": filename, "quality": quality},
+        json={
+            "face_slim": {"enabled": True, "intensity": 0.5},
+            "body_slim": {"enabled": True, "intensity": 0.5},
+            "beauty_filter": {"enabled": True, "type": "natural", "intensity": 0.5},
+        }
+    ))
+    task_id = response.json()["task_id"]
+
+    while True:
+        response = await timed("task", client.get(f"/api/task/{task_id}"))
+        status = response.json()["status"]
+        if status == "completed":
+            break
+        if status == "failed":
+            raise RuntimeError(f"任务失败: {response.json().get('error')}")
+        await asyncio.sleep(poll_interval)
+
+    await timed("result", client.get(f"/api/result/{task_id}"))
+    latencies["end_to_end"].append(time.perf_counter() - session_start)
+
+
+async def run_load(args) -> Dict:
+    image = make_test_image(args.image_size)
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=90)
+    image_bytes = buffer.getvalue()
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    remaining = list(range(args.sessions))
+
+    async def worker():
+        while remaining:
+            remaining.pop()
+            try:
+                await asyncio.wait_for(
+                    run_session(client, image_bytes, args.quality, args.poll_interval, latencies),
+                    timeout=args.timeout
+                )
+            except Exception as e:
+                errors[type(e).__name__] += 1
+
+    with contextlib.ExitStack() as stack:
+        if args.base_url:
+            client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+        else:
+            # 临时目录在压测结束后删除
+            work_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix="chouxiaoyou-bench-"))
+            client = create_in_process_client(work_dir, args.simulate_delay)
+
+        async with client:
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - start
+
+    completed = len(latencies["end_to_end"])
+    return {
+        "config": {
+            "mode": args.base_url or "in-process (celery eager)",
+            "sessions": args.sessions,
+            "concurrency": args.concurrency,
+            "image_size": args.image_size,
+            "quality": args.quality,
+            "simulate_delay": None if args.base_url else args.simulate_delay,
+        },
+        "completed": completed,
+        "errors": dict(errors),
+        "duration_seconds": elapsed,
+        "throughput": completed / elapsed if elapsed > 0 else 0.0,
+        "requests_per_second": sum(len(latencies[e]) for e in ENDPOINTS) / elapsed if elapsed > 0 else 0.0,
+        "latency": {
+            name: summarize_latencies(latencies[name])
+            for name in ENDPOINTS + ("end_to_end",)
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="上传→处理→结果 全链路负载测试")
+    parser.add_argument("--sessions", type=int, default=50, help="完整会话总数")
+    parser.add_argument("--concurrency", type=int, default=8, help="并发会话数")
+    parser.add_argument("--image-size", type=int, default=1024, help="上传图片长边尺寸")
+    parser.add_argument("--quality", default="standard", choices=["preview", "standard", "final"])
+    parser.add_argument("--base-url", help="压测已启动的后端（默认进程内运行）")
+    parser.add_argument("--simulate-delay", type=float, default=0.0,
+                        help="进程内模式下模拟处理的耗时（秒）")
+    parser.add_argument("--poll-interval", type=float, default=0.2, help="任务状态轮询间隔（秒）")
+    parser.add_argument("--timeout", type=float, default=300, help="单个会话超时（秒）")
+    parser.add_argument("--output", help="JSON 结果输出路径")
+    parser.add_argument("--baseline", help="用于对比的基线 JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_load(args))
+    report = write_results("load_test", results, args.output)
+    if args.baseline:
+        compare_to_baseline(report, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
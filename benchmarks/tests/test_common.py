@@ -0,0 +1,35 @@
+"""
+基准测试公共工具测试
+"""
+import random
+
+import pytest
+
+from common import summarize_latencies
+
+
+@pytest.mark.parametrize("n, p50, p95, p99", [
+    (1, 1, 1, 1),
+    (2, 1, 2, 2),
+    (4, 2, 4, 4),
+    (5, 3, 5, 5),
+    (9, 5, 9, 9),
+    (10, 5, 10, 10),
+    (13, 7, 13, 13),
+    (20, 10, 19, 20),
+    (100, 50, 95, 99),
+    (200, 100, 190, 198),
+])
+def test_percentiles_use_nearest_rank(n, p50, p95, p99):
+    latencies = list(range(1, n + 1))
+    random.Random(n).shuffle(latencies)
+
+    stats = summarize_latencies(latencies)
+
+    assert (stats["p50"], stats["p95"], stats["p99"]) == (p50, p95, p99)
+    assert stats["count"] == n
+    assert (stats["min"], stats["max"]) == (1, n)
+
+
+def test_empty_latencies():
+    assert summarize_latencies([]) == {"count": 0}
@@ -6,7 +6,7 @@ import { Loader2 } from 'lucide-react'
 import { useStore } from '@/store/useStore'
 
 export function ProcessingModal() {
-  const { progress } = useStore()
+  const { progress, stepPreview } = useStore()
   const [currentStep, setCurrentStep] = useState(0)
 
   const steps = [
@@ -39,6 +39,17 @@ export function ProcessingModal() {
             <h3 className="text-2xl font-bold mb-2">正在处理中</h3>
             <p className="text-gray-600 mb-6">请稍候，AI 正在为您优化图片...</p>
 
+            {stepPreview && (
+              <div className="mb-6">
+                {/* eslint-disable-next-line @next/next/no-img-element */}
+                <img
+                  src={stepPreview}
+                  alt="处理预览"
+                  className="mx-auto max-h-48 rounded-lg shadow"
+                />
+              </div>
+            )}
+
             <div className="space-y-4 mb-6">
               {steps.map((step, index) => (
                 <div
@@ -69,7 +69,8 @@ export const api = {
 
   // 等待任务完成并返回结果URL
   waitForResult: async (taskId: string): Promise<string> => {
-    const { setProgress } = useStore.getState()
+    const { setProgress, setStepPreview } = useStore.getState()
+    setStepPreview(null)
     let attempts = 0
     const maxAttempts = 60 // 最多等待60秒
 
@@ -81,6 +82,11 @@ export const api = {
           setProgress(data.progress)
         }
 
+        // 去噪过程的中间预览
+        if (data.preview) {
+          setStepPreview(data.preview)
+        }
+
         if (data.status === 'completed') {
           // 获取结果图片
           const resultResponse = await api.getResult(taskId)
@@ -28,6 +28,7 @@ interface AppState {
   // 状态
   isProcessing: boolean
   progress: number
+  stepPreview: string | null
   error: string | null
   
   // Actions
@@ -37,6 +38,7 @@ interface AppState {
   updateParams: (params: Partial<ProcessingParams>) => void
   setProcessing: (isProcessing: boolean) => void
   setProgress: (progress: number) => void
+  setStepPreview: (preview: string | null) => void
   setError: (error: string | null) => void
   reset: () => void
 }
@@ -65,6 +67,7 @@ export const useStore = create<AppState>((set) => ({
   params: initialParams,
   isProcessing: false,
   progress: 0,
+  stepPreview: null,
   error: null,
   
   // Actions
@@ -81,6 +84,7 @@ export const useStore = create<AppState>((set) => ({
   
   setProcessing: (isProcessing) => set({ isProcessing }),
   setProgress: (progress) => set({ progress }),
+  setStepPreview: (stepPreview) => set({ stepPreview }),
   setError: (error) => set({ error }),
   
   reset: () => set({
@@ -90,6 +94,7 @@ export const useStore = create<AppState>((set) => ({
     params: initialParams,
     isProcessing: false,
     progress: 0,
+    stepPreview: null,
     error: null
   })
 }))
\ No newline at end of file